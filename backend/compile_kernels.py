@@ -0,0 +1,21 @@
+"""
+Compile the route algorithms' Numba kernels into their on-disk cache ahead
+of time, so the API, the worker and the tests load them instead of
+compiling on first use. Run from the backend directory after installing
+dependencies:
+
+    python compile_kernels.py
+"""
+
+import numpy as np
+
+from routes.algorithms import NUMBA_AVAILABLE, warm_up_kernels
+from routes.enhanced_algorithms import pairwise_haversine
+
+if __name__ == "__main__":
+    if not NUMBA_AVAILABLE:
+        print("Numba is not installed; the algorithms will use their NumPy fallbacks")
+    else:
+        warm_up_kernels()
+        pairwise_haversine(np.zeros(2), np.zeros(2))
+        print("Numba kernels compiled and cached")
@@ -8,8 +8,17 @@ Route optimization algorithms implementation:
 
 import heapq
 import math
+from collections import defaultdict
 from typing import List, Tuple, Dict, Any, Optional
 
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional - the matrix kernels fall back to NumPy / plain Python
+    NUMBA_AVAILABLE = False
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -29,6 +38,51 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return c * r
 
 
+def haversine_path_km(points: List[Tuple[float, float]]) -> float:
+    """
+    Total great circle length of a polyline of (lat, lng) points, in kilometers.
+    All segments are computed at once with NumPy instead of one
+    haversine_distance call per segment.
+    """
+    if len(points) < 2:
+        return 0.0
+    coords = np.radians(np.asarray(points, dtype=np.float64))
+    lat, lng = coords[:, 0], coords[:, 1]
+    
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    return float(6371 * 2 * np.arcsin(np.sqrt(a)).sum())
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _haversine_matrix_nb(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        n = len(lat)
+        cos_lat = np.cos(lat)
+        D = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                s_lat = math.sin((lat[j] - lat[i]) * 0.5)
+                s_lng = math.sin((lng[j] - lng[i]) * 0.5)
+                a = s_lat * s_lat + cos_lat[i] * cos_lat[j] * s_lng * s_lng
+                D[i, j] = D[j, i] = 12742.0 * math.asin(math.sqrt(a))
+        return D
+
+
+def haversine_matrix(lats, lngs) -> np.ndarray:
+    """
+    (N, N) matrix of great circle distances in kilometers between all pairs
+    of points given as parallel latitude/longitude arrays in degrees
+    """
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    if NUMBA_AVAILABLE:
+        return _haversine_matrix_nb(lat, lng)
+    
+    a = (np.sin((lat[None, :] - lat[:, None]) / 2) ** 2
+         + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin((lng[None, :] - lng[:, None]) / 2) ** 2)
+    return 6371 * 2 * np.arcsin(np.sqrt(a))
+
+
 def dijkstra(graph: Dict[int, List[Tuple[int, float]]], start: int, end: int) -> Tuple[List[int], float]:
     """
     Dijkstra's algorithm implementation for finding shortest path
@@ -39,30 +93,41 @@ def dijkstra(graph: Dict[int, List[Tuple[int, float]]], start: int, end: int) ->
     Returns:
         (path, distance) tuple
     """
-    distances = {node: float('inf') for node in graph}
+    # Only nodes the search actually reaches get an entry
+    distances = defaultdict(lambda: math.inf)
     distances[start] = 0
     previous = {}
     pq = [(0, start)]
     visited = set()
+    # Local aliases skip global and attribute lookups in the hot loop
+    INF = math.inf
+    hpush, hpop = heapq.heappush, heapq.heappop
+    visited_add = visited.add
+    graph_get = graph.get
+    # Best distance to end found so far; with non-negative weights nothing at
+    # or beyond it can lead to a shorter path, so such entries are never queued
+    bound = INF
     
     while pq:
-        current_distance, current_node = heapq.heappop(pq)
+        current_distance, current_node = hpop(pq)
         
         if current_node in visited:
             continue
             
-        visited.add(current_node)
+        visited_add(current_node)
         
         if current_node == end:
             break
             
-        for neighbor, weight in graph.get(current_node, []):
+        for neighbor, weight in graph_get(current_node, []):
             distance = current_distance + weight
             
-            if distance < distances[neighbor]:
+            if distance < distances[neighbor] and distance < bound:
                 distances[neighbor] = distance
                 previous[neighbor] = current_node
-                heapq.heappush(pq, (distance, neighbor))
+                if neighbor == end:
+                    bound = distance
+                hpush(pq, (distance, neighbor))
     
     # Reconstruct path
     path = []
@@ -76,6 +141,92 @@ def dijkstra(graph: Dict[int, List[Tuple[int, float]]], start: int, end: int) ->
     return path, distances[end]
 
 
+def reverse_graph(graph: Dict[int, List[Tuple[int, float]]]) -> Dict[int, List[Tuple[int, float]]]:
+    """
+    Reverse every edge of an adjacency list graph
+    Args:
+        graph: adjacency list representation {node: [(neighbor, weight), ...]}
+    Returns:
+        {node: [(predecessor, weight), ...]}
+    """
+    rev_graph = {node: [] for node in graph}
+    for node, neighbors in graph.items():
+        for neighbor, weight in neighbors:
+            rev_graph.setdefault(neighbor, []).append((node, weight))
+    return rev_graph
+
+
+def bidirectional_dijkstra(graph: Dict[int, List[Tuple[int, float]]], 
+                           start: int, 
+                           end: int,
+                           rev_graph: Optional[Dict[int, List[Tuple[int, float]]]] = None) -> Tuple[List[int], float]:
+    """
+    Dijkstra's algorithm searching from both ends at once for point-to-point
+    queries; the two searches stop once their frontiers can no longer improve
+    on the best meeting point, settling far fewer nodes than a one-sided search
+    Args:
+        graph: adjacency list representation {node: [(neighbor, weight), ...]}
+        start: start node
+        end: end node
+        rev_graph: reverse_graph(graph), if already built
+    Returns:
+        (path, distance) tuple, same as dijkstra
+    """
+    if start == end:
+        return [start], 0
+    if rev_graph is None:
+        rev_graph = reverse_graph(graph)
+    
+    INF = math.inf
+    hpush, hpop = heapq.heappush, heapq.heappop
+    # Forward search from start over graph, backward search from end over rev_graph
+    dist_f, dist_b = {start: 0}, {end: 0}
+    prev_f, next_b = {}, {}
+    pq_f, pq_b = [(0, start)], [(0, end)]
+    done_f, done_b = set(), set()
+    # Length of the best start -> meet -> end path seen so far
+    best = INF
+    meet = None
+    
+    while pq_f and pq_b:
+        if pq_f[0][0] + pq_b[0][0] >= best:
+            break
+        
+        # Advance whichever search has the nearer frontier
+        if pq_f[0][0] <= pq_b[0][0]:
+            adjacency, pq, done, dist, other_dist, links = graph, pq_f, done_f, dist_f, dist_b, prev_f
+        else:
+            adjacency, pq, done, dist, other_dist, links = rev_graph, pq_b, done_b, dist_b, dist_f, next_b
+        
+        current_distance, current_node = hpop(pq)
+        if current_node in done:
+            continue
+        done.add(current_node)
+        
+        for neighbor, weight in adjacency.get(current_node, []):
+            distance = current_distance + weight
+            if distance < dist.get(neighbor, INF):
+                dist[neighbor] = distance
+                links[neighbor] = current_node
+                hpush(pq, (distance, neighbor))
+            if neighbor in other_dist and dist[neighbor] + other_dist[neighbor] < best:
+                best = dist[neighbor] + other_dist[neighbor]
+                meet = neighbor
+    
+    if meet is None:
+        return [start], INF
+    
+    # Splice the forward chain start -> meet with the backward chain meet -> end
+    path = [meet]
+    while path[-1] != start:
+        path.append(prev_f[path[-1]])
+    path.reverse()
+    while path[-1] != end:
+        path.append(next_b[path[-1]])
+    
+    return path, best
+
+
 def astar(graph: Dict[int, List[Tuple[int, float]]], 
           node_coords: Dict[int, Tuple[float, float]], 
           start: int, 
@@ -90,37 +241,51 @@ def astar(graph: Dict[int, List[Tuple[int, float]]],
     Returns:
         (path, distance) tuple
     """
-    def heuristic(node1: int, node2: int) -> float:
-        """Calculate heuristic distance between two nodes"""
-        lat1, lng1 = node_coords[node1]
-        lat2, lng2 = node_coords[node2]
-        return haversine_distance(lat1, lng1, lat2, lng2)
+    # The goal never changes during a search, so its trig terms are computed
+    # once and each node's estimate is cached the first time it is needed
+    end_lat, end_lng = math.radians(node_coords[end][0]), math.radians(node_coords[end][1])
+    cos_end_lat = math.cos(end_lat)
+    h_cache: Dict[int, float] = {}
+    
+    def heuristic(node: int) -> float:
+        """Haversine distance from node to the goal, in kilometers"""
+        h = h_cache.get(node)
+        if h is None:
+            lat, lng = math.radians(node_coords[node][0]), math.radians(node_coords[node][1])
+            a = math.sin((end_lat - lat) / 2)**2 + math.cos(lat) * cos_end_lat * math.sin((end_lng - lng) / 2)**2
+            h = h_cache[node] = 2 * math.asin(math.sqrt(a)) * 6371
+        return h
     
-    distances = {node: float('inf') for node in graph}
+    # Only nodes the search actually reaches get an entry
+    distances = defaultdict(lambda: math.inf)
     distances[start] = 0
     previous = {}
     pq = [(0, start)]
     visited = set()
+    # Local aliases skip global and attribute lookups in the hot loop
+    hpush, hpop = heapq.heappush, heapq.heappop
+    visited_add = visited.add
+    graph_get = graph.get
     
     while pq:
-        current_distance, current_node = heapq.heappop(pq)
+        current_distance, current_node = hpop(pq)
         
         if current_node in visited:
             continue
             
-        visited.add(current_node)
+        visited_add(current_node)
         
         if current_node == end:
             break
             
-        for neighbor, weight in graph.get(current_node, []):
+        for neighbor, weight in graph_get(current_node, []):
             distance = current_distance + weight
             
             if distance < distances[neighbor]:
                 distances[neighbor] = distance
                 previous[neighbor] = current_node
-                priority = distance + heuristic(neighbor, end)
-                heapq.heappush(pq, (priority, neighbor))
+                priority = distance + heuristic(neighbor)
+                hpush(pq, (priority, neighbor))
     
     # Reconstruct path
     path = []
@@ -134,10 +299,182 @@ def astar(graph: Dict[int, List[Tuple[int, float]]],
     return path, distances[end]
 
 
+def build_csr(graph: Dict[int, List[Tuple[int, float]]]) -> Tuple[
+    List[int], 
+    Dict[int, int], 
+    np.ndarray, 
+    np.ndarray, 
+    np.ndarray
+]:
+    """
+    Flatten an adjacency list graph into CSR arrays: the out-edges of
+    node_ids[r] are positions indptr[r]:indptr[r+1] of targets and weights,
+    with targets given as rows. Build once and reuse it across queries.
+    Args:
+        graph: adjacency list representation {node: [(neighbor, weight), ...]}
+    Returns:
+        (node_ids, index {node: row}, indptr, targets, weights) tuple
+    """
+    node_ids = list(graph)
+    index = {node: row for row, node in enumerate(node_ids)}
+    # Nodes that only appear as neighbors get rows with no out-edges
+    for neighbors in graph.values():
+        for neighbor, _ in neighbors:
+            if neighbor not in index:
+                index[neighbor] = len(node_ids)
+                node_ids.append(neighbor)
+    
+    degrees = np.zeros(len(node_ids) + 1, dtype=np.int64)
+    degrees[1:len(graph) + 1] = [len(neighbors) for neighbors in graph.values()]
+    indptr = np.cumsum(degrees)
+    num_edges = int(indptr[-1])
+    targets = np.fromiter((index[neighbor] for neighbors in graph.values() for neighbor, _ in neighbors),
+                          dtype=np.int64, count=num_edges)
+    weights = np.fromiter((weight for neighbors in graph.values() for _, weight in neighbors),
+                          dtype=np.float64, count=num_edges)
+    return node_ids, index, indptr, targets, weights
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _dijkstra_csr_nb(indptr: np.ndarray, targets: np.ndarray, weights: np.ndarray, source: int, target: int):
+        n = len(indptr) - 1
+        dist = np.full(n, np.inf)
+        prev = np.full(n, -1, dtype=np.int64)
+        done = np.zeros(n, dtype=np.bool_)
+        # Binary heap of (key, node) pairs in parallel arrays, ordered like
+        # heapq's tuples; every push follows a relaxation, so E + 1 slots suffice
+        keys = np.empty(len(targets) + 1)
+        nodes = np.empty(len(targets) + 1, dtype=np.int64)
+        dist[source] = 0.0
+        keys[0] = 0.0
+        nodes[0] = source
+        size = 1
+        bound = np.inf
+        
+        while size:
+            d = keys[0]
+            u = nodes[0]
+            size -= 1
+            if size:
+                # Sift the last entry down from the root
+                key = keys[size]
+                node = nodes[size]
+                i = 0
+                while True:
+                    c = 2 * i + 1
+                    if c >= size:
+                        break
+                    if c + 1 < size and (keys[c + 1] < keys[c] or (keys[c + 1] == keys[c] and nodes[c + 1] < nodes[c])):
+                        c += 1
+                    if keys[c] < key or (keys[c] == key and nodes[c] < node):
+                        keys[i] = keys[c]
+                        nodes[i] = nodes[c]
+                        i = c
+                    else:
+                        break
+                keys[i] = key
+                nodes[i] = node
+            
+            if done[u]:
+                continue
+            done[u] = True
+            if u == target:
+                break
+            
+            for e in range(indptr[u], indptr[u + 1]):
+                v = targets[e]
+                nd = d + weights[e]
+                if nd < dist[v] and nd < bound:
+                    dist[v] = nd
+                    prev[v] = u
+                    if v == target:
+                        bound = nd
+                    # Sift the new entry up from the end
+                    i = size
+                    size += 1
+                    while i:
+                        p = (i - 1) // 2
+                        if keys[p] < nd or (keys[p] == nd and nodes[p] < v):
+                            break
+                        keys[i] = keys[p]
+                        nodes[i] = nodes[p]
+                        i = p
+                    keys[i] = nd
+                    nodes[i] = v
+        return dist, prev
+
+
+def dijkstra_csr(csr: Tuple[List[int], Dict[int, int], np.ndarray, np.ndarray, np.ndarray], 
+                 start: int, 
+                 end: int) -> Tuple[List[int], float]:
+    """
+    Dijkstra's algorithm over a graph prepared with build_csr; with Numba the
+    search runs compiled over the flat arrays. Building the CSR costs about
+    as much as one dict-based search, so this pays off for repeated queries
+    on the same graph.
+    Args:
+        csr: build_csr(graph)
+        start: start node
+        end: end node
+    Returns:
+        (path, distance) tuple, same as dijkstra
+    """
+    node_ids, index, indptr, targets, weights = csr
+    if start == end:
+        return [start], 0
+    if start not in index or end not in index:
+        return [start], math.inf
+    source, target = index[start], index[end]
+    
+    if NUMBA_AVAILABLE:
+        dist, prev = _dijkstra_csr_nb(indptr, targets, weights, source, target)
+        prev = prev.tolist()
+        distance = float(dist[target])
+    else:
+        offsets, heads, lengths = indptr.tolist(), targets.tolist(), weights.tolist()
+        dist = [math.inf] * len(node_ids)
+        prev = [-1] * len(node_ids)
+        done = [False] * len(node_ids)
+        dist[source] = 0
+        pq = [(0, source)]
+        bound = math.inf
+        while pq:
+            d, u = heapq.heappop(pq)
+            if done[u]:
+                continue
+            done[u] = True
+            if u == target:
+                break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = heads[e]
+                nd = d + lengths[e]
+                if nd < dist[v] and nd < bound:
+                    dist[v] = nd
+                    prev[v] = u
+                    if v == target:
+                        bound = nd
+                    heapq.heappush(pq, (nd, v))
+        distance = dist[target]
+    
+    # Reconstruct path
+    path = []
+    current = target
+    while prev[current] != -1:
+        path.append(node_ids[current])
+        current = prev[current]
+    path.append(start)
+    path.reverse()
+    
+    return path, distance
+
+
 def nearest_neighbor(nodes: List[int], 
                     distance_matrix: Dict[Tuple[int, int], float]) -> Tuple[List[int], float]:
     """
     Nearest Neighbor heuristic for TSP
+    The dict is indexed once into a dense matrix and the tour is built by
+    nearest_neighbor_matrix; ties go to the node listed first.
     Args:
         nodes: list of node IDs (first node is starting point)
         distance_matrix: {(node_i, node_j): distance}
@@ -147,65 +484,28 @@ def nearest_neighbor(nodes: List[int],
     if len(nodes) <= 1:
         return nodes, 0
     
-    unvisited = set(nodes[1:])  # All nodes except start
-    current = nodes[0]
-    tour = [current]
-    total_distance = 0
-    
-    while unvisited:
-        nearest = min(unvisited, key=lambda x: distance_matrix.get((current, x), float('inf')))
-        total_distance += distance_matrix.get((current, nearest), float('inf'))
-        current = nearest
-        tour.append(current)
-        unvisited.remove(nearest)
-    
-    # Return to start
-    total_distance += distance_matrix.get((current, nodes[0]), float('inf'))
-    tour.append(nodes[0])
-    
-    return tour, total_distance
+    tour, total_distance = nearest_neighbor_matrix(_as_matrix(distance_matrix, nodes))
+    return [nodes[i] for i in tour], total_distance
 
 
 def two_opt(tour: List[int], 
            distance_matrix: Dict[Tuple[int, int], float]) -> Tuple[List[int], float]:
     """
     2-opt improvement heuristic for TSP
+    The dict is indexed once into a dense matrix and the tour is improved
+    by two_opt_matrix, which scores each move by its O(1) change in length
+    and so assumes distances are symmetric.
     Args:
         tour: initial tour
         distance_matrix: {(node_i, node_j): distance}
     Returns:
         (improved_tour, total_distance) tuple
     """
-    def calculate_tour_distance(tour_list: List[int]) -> float:
-        """Calculate total distance of tour"""
-        total = 0
-        for i in range(len(tour_list) - 1):
-            total += distance_matrix.get((tour_list[i], tour_list[i+1]), float('inf'))
-        return total
-    
-    best_tour = tour[:]
-    best_distance = calculate_tour_distance(best_tour)
-    improved = True
-    
-    while improved:
-        improved = False
-        for i in range(1, len(best_tour) - 2):
-            for j in range(i + 1, len(best_tour)):
-                if j - i == 1:
-                    continue  # Skip adjacent edges
-                    
-                # Create new tour by reversing segment between i and j
-                new_tour = best_tour[:]
-                new_tour[i:j] = reversed(new_tour[i:j])
-                
-                new_distance = calculate_tour_distance(new_tour)
-                
-                if new_distance < best_distance:
-                    best_tour = new_tour
-                    best_distance = new_distance
-                    improved = True
-                    
-    return best_tour, best_distance
+    nodes = list(dict.fromkeys(tour))
+    position = {node: i for i, node in enumerate(nodes)}
+    best_tour, total_distance = two_opt_matrix([position[node] for node in tour], 
+                                               _as_matrix(distance_matrix, nodes))
+    return [nodes[i] for i in best_tour], total_distance
 
 
 def create_graph_from_edges(edges: List[Dict[str, Any]]) -> Tuple[
@@ -245,20 +545,168 @@ def create_graph_from_edges(edges: List[Dict[str, Any]]) -> Tuple[
     return graph, node_coords
 
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _nearest_neighbor_nb(D: np.ndarray, start: int):
+        n = D.shape[0]
+        visited = np.zeros(n, dtype=np.bool_)
+        tour = np.empty(n + 1, dtype=np.int64)
+        visited[start] = True
+        tour[0] = start
+        current = start
+        total_distance = 0.0
+        for k in range(1, n):
+            nearest = -1
+            nearest_distance = np.inf
+            for j in range(n):
+                if not visited[j] and (nearest == -1 or D[current, j] < nearest_distance):
+                    nearest = j
+                    nearest_distance = D[current, j]
+            total_distance += nearest_distance
+            current = nearest
+            tour[k] = current
+            visited[current] = True
+        total_distance += D[current, start]
+        tour[n] = start
+        return tour, total_distance
+
+    @njit(cache=True)
+    def _two_opt_nb(tour: np.ndarray, D: np.ndarray):
+        m = len(tour)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, m - 2):
+                for j in range(i + 2, m):
+                    a, b = tour[i - 1], tour[i]
+                    c, e = tour[j - 1], tour[j]
+                    if D[a, c] + D[b, e] - D[a, b] - D[c, e] < -1e-12:
+                        lo, hi = i, j - 1
+                        while lo < hi:
+                            tour[lo], tour[hi] = tour[hi], tour[lo]
+                            lo += 1
+                            hi -= 1
+                        improved = True
+        total_distance = 0.0
+        for k in range(m - 1):
+            total_distance += D[tour[k], tour[k + 1]]
+        return tour, total_distance
+
+
+def _as_matrix(distance_matrix: Dict[Tuple[int, int], float], nodes: List[int]) -> np.ndarray:
+    """
+    Dense (N, N) array of a {(node_i, node_j): distance} dict, with rows and
+    columns in the order of nodes; missing pairs are infinitely far apart
+    """
+    return np.array([
+        [0.0 if u == v else distance_matrix.get((u, v), math.inf) for v in nodes]
+        for u in nodes
+    ], dtype=np.float64).reshape(len(nodes), len(nodes))
+
+
+def nearest_neighbor_matrix(D: np.ndarray, start: int = 0) -> Tuple[List[int], float]:
+    """
+    Nearest Neighbor heuristic for TSP over a dense distance matrix
+    Args:
+        D: (N, N) array, D[i, j] = distance from position i to position j
+        start: starting position
+    Returns:
+        (tour of positions, total_distance) tuple
+    """
+    if NUMBA_AVAILABLE:
+        tour, total_distance = _nearest_neighbor_nb(np.ascontiguousarray(D, dtype=np.float64), start)
+        return tour.tolist(), float(total_distance)
+    
+    n = len(D)
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    current = start
+    tour = [current]
+    total_distance = 0.0
+    
+    for _ in range(n - 1):
+        # One masked argmin per step instead of a min() over a dict
+        nearest = int(np.argmin(np.where(visited, np.inf, D[current])))
+        if visited[nearest]:
+            # Every remaining node is unreachable; take the first of them
+            nearest = int(np.argmin(visited))
+        total_distance += D[current, nearest]
+        current = nearest
+        tour.append(current)
+        visited[nearest] = True
+    
+    # Return to start
+    total_distance += D[current, start]
+    tour.append(start)
+    
+    return tour, float(total_distance)
+
+
+def two_opt_matrix(tour: List[int], D: np.ndarray) -> Tuple[List[int], float]:
+    """
+    2-opt improvement heuristic for TSP over a dense, symmetric distance matrix
+    Each candidate move is scored by its O(1) change in length instead of
+    re-summing a copied tour.
+    Args:
+        tour: initial closed tour of positions
+        D: (N, N) symmetric array of distances between positions
+    Returns:
+        (improved_tour, total_distance) tuple
+    """
+    if NUMBA_AVAILABLE:
+        best_tour, total_distance = _two_opt_nb(np.array(tour, dtype=np.int64), np.ascontiguousarray(D, dtype=np.float64))
+        return best_tour.tolist(), float(total_distance)
+    
+    d = D.tolist()  # Nested lists index faster than NumPy scalars
+    best_tour = list(tour)
+    improved = True
+    
+    while improved:
+        improved = False
+        for i in range(1, len(best_tour) - 2):
+            for j in range(i + 2, len(best_tour)):
+                a, b = best_tour[i - 1], best_tour[i]
+                c, e = best_tour[j - 1], best_tour[j]
+                # Reversing best_tour[i:j] swaps edges (a,b),(c,e) for (a,c),(b,e)
+                if d[a][c] + d[b][e] - d[a][b] - d[c][e] < -1e-12:
+                    best_tour[i:j] = best_tour[i:j][::-1]
+                    improved = True
+    
+    total_distance = sum(d[best_tour[k]][best_tour[k + 1]] for k in range(len(best_tour) - 1))
+    return best_tour, total_distance
+
+
 def nn_plus_2opt(nodes: List[int], 
-                distance_matrix: Dict[Tuple[int, int], float]) -> Tuple[List[int], float]:
+                distance_matrix) -> Tuple[List[int], float]:
     """
     Combined Nearest Neighbor + 2-opt approach for TSP
     Args:
         nodes: list of node IDs
-        distance_matrix: {(node_i, node_j): distance}
+        distance_matrix: {(node_i, node_j): distance}, or an (N, N) symmetric
+            array where entry [i, j] is the distance between nodes[i] and nodes[j]
     Returns:
         (optimized_tour, total_distance) tuple
     """
-    # Get initial solution with Nearest Neighbor
-    initial_tour, _ = nearest_neighbor(nodes, distance_matrix)
-    
-    # Improve with 2-opt
-    optimized_tour, total_distance = two_opt(initial_tour, distance_matrix)
+    if len(nodes) <= 1:
+        return nodes, 0
+    if not isinstance(distance_matrix, np.ndarray):
+        # Tuple-keyed lookups would dominate both passes, so the dict is
+        # indexed once into a dense matrix and solved like one
+        distance_matrix = _as_matrix(distance_matrix, nodes)
     
-    return optimized_tour, total_distance
\ No newline at end of file
+    # Get initial solution with Nearest Neighbor, then improve with 2-opt
+    tour, _ = nearest_neighbor_matrix(distance_matrix)
+    tour, total_distance = two_opt_matrix(tour, distance_matrix)
+    return [nodes[i] for i in tour], total_distance
+
+
+def warm_up_kernels() -> None:
+    """
+    Compile the Numba kernels, or load them from their on-disk cache, on
+    tiny inputs so the first real request doesn't pay for it
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    D = haversine_matrix([0.0, 0.0, 1.0], [0.0, 1.0, 0.0])
+    nn_plus_2opt([0, 1, 2], D)
+    dijkstra_csr(build_csr({0: [(1, 1.0)]}), 0, 1)
@@ -2,52 +2,183 @@
 Enhanced Route optimization algorithms implementation with step-by-step execution tracking:
 - Dijkstra's algorithm for shortest path with detailed traversal logging
 - A* algorithm with heuristic and detailed traversal logging
+- Bidirectional A* searching from both ends with detailed traversal logging
 - Support for multiple intermediate stops
 """
 
+import functools
 import heapq
 import math
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 from dataclasses import dataclass
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 import json
 
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional - pairwise_haversine falls back to NumPy broadcasting
+    NUMBA_AVAILABLE = False
+
 
 @dataclass
 class AlgorithmStep:
-    """Represents a single step in algorithm execution"""
+    """
+    Represents a single step in algorithm execution
+    Only the change the step made is stored; materialize() replays a run's
+    steps into the full per-step snapshots the frontend displays.
+    Searches record into a StepTrace, which hands these out on demand.
+    """
     step_number: int
     current_node: int
-    visited_nodes: List[int]
-    frontier_nodes: List[Tuple[float, int]]  # (priority, node)
-    distances: Dict[int, float]
-    previous_nodes: Dict[int, int]
     description: str
-    timestamp: str
-
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary with JSON-serializable values"""
-        # Handle infinity values in distances
-        json_distances = {}
-        for k, v in self.distances.items():
-            if isinstance(v, float) and (v == float('inf') or v == float('-inf')):
-                # Convert infinity to a large finite number or string representation
-                json_distances[int(k)] = 999999.0 if v > 0 else -999999.0
-            else:
-                json_distances[int(k)] = float(v)
+    started_at: datetime  # wall-clock start of the search, shared by its steps
+    t_ns: int  # monotonic nanoseconds since started_at
+    visited_node: Optional[int] = None  # node popped and marked visited
+    relaxed: Optional[Tuple[int, float, int, float]] = None  # (neighbor, distance, previous, priority)
+    side: int = 0  # 0 = search from start, 1 = search from end (bidirectional A* only)
+
+    @property
+    def timestamp(self) -> str:
+        """ISO wall-clock time of the step, formatted only when asked for"""
+        return (self.started_at + timedelta(microseconds=self.t_ns // 1000)).isoformat()
+
+
+class StepTrace:
+    """
+    The steps of one search stored column-wise: recording a step appends its
+    fields to parallel lists instead of building an object per step.
+    Indexing or iterating yields AlgorithmStep views; step numbers are 1-based
+    positions in the trace. Descriptions are kept as a %-format template and
+    its arguments and only formatted when a step is read.
+    """
+    
+    def __init__(self):
+        self.started_at = datetime.now()  # wall-clock start of the search
+        self._t0 = time.perf_counter_ns()
+        self.current_nodes: List[int] = []
+        self.descriptions: List[Tuple[str, tuple]] = []  # (template, args)
+        self.t_ns: List[int] = []  # monotonic nanoseconds since started_at
+        self.visited_nodes: List[Optional[int]] = []
+        self.relaxed: List[Optional[Tuple[int, float, int, float]]] = []
+        self.sides: List[int] = []
+    
+    def visit(self, node: int, template: str, args: tuple, side: int = 0) -> None:
+        """Record node being popped and marked visited"""
+        self.current_nodes.append(node)
+        self.descriptions.append((template, args))
+        self.t_ns.append(time.perf_counter_ns() - self._t0)
+        self.visited_nodes.append(node)
+        self.relaxed.append(None)
+        self.sides.append(side)
+    
+    def relax(self, current_node: int, template: str, args: tuple, 
+              relaxed: Tuple[int, float, int, float], side: int = 0) -> None:
+        """Record an improved (neighbor, distance, previous, priority) from current_node"""
+        self.current_nodes.append(current_node)
+        self.descriptions.append((template, args))
+        self.t_ns.append(time.perf_counter_ns() - self._t0)
+        self.visited_nodes.append(None)
+        self.relaxed.append(relaxed)
+        self.sides.append(side)
+    
+    def description(self, i: int) -> str:
+        """Text of step i (0-based)"""
+        template, args = self.descriptions[i]
+        return template % args
+    
+    def timestamp(self, i: int) -> str:
+        """ISO wall-clock time of step i (0-based)"""
+        return (self.started_at + timedelta(microseconds=self.t_ns[i] // 1000)).isoformat()
+    
+    def __len__(self) -> int:
+        return len(self.current_nodes)
+    
+    def __getitem__(self, i: int) -> AlgorithmStep:
+        i = range(len(self))[i]
+        return AlgorithmStep(
+            step_number=i + 1,
+            current_node=self.current_nodes[i],
+            description=self.description(i),
+            started_at=self.started_at,
+            t_ns=self.t_ns[i],
+            visited_node=self.visited_nodes[i],
+            relaxed=self.relaxed[i],
+            side=self.sides[i]
+        )
+    
+    def __iter__(self) -> Iterator[AlgorithmStep]:
+        return (self[i] for i in range(len(self)))
+
+
+def iter_snapshots(steps: StepTrace) -> Iterator[Dict[str, Any]]:
+    """
+    Replay the steps of one search, yielding a JSON-serializable snapshot of
+    its visited set, frontier, distances and previous nodes after each step.
+    For a bidirectional search the two sides are merged into one snapshot;
+    where both reached a node, the start side's distance and previous win.
+    """
+    if not steps:
+        return
+    # Per side state; side 1 is only used by bidirectional searches and
+    # opens at the first node it visits (the goal)
+    distances = ({}, {})
+    previous = ({}, {})
+    visited = (set(), set())
+    pqs = ([], [])
+    for side in (0, 1):
+        first = next((node for node, node_side in zip(steps.visited_nodes, steps.sides)
+                      if node is not None and node_side == side), None)
+        if first is not None:
+            distances[side][first] = 0.0
+            pqs[side].append((0.0, first))
+    bidirectional = bool(pqs[1])
+    
+    for i, (visited_node, relaxed, side) in enumerate(zip(steps.visited_nodes, steps.relaxed, steps.sides)):
+        if visited_node is not None:
+            # Drop the stale entries the search skipped before this visit
+            while heapq.heappop(pqs[side])[1] in visited[side]:
+                pass
+            visited[side].add(visited_node)
+        else:
+            neighbor, distance, previous_node, priority = relaxed
+            distances[side][neighbor] = distance
+            previous[side][neighbor] = previous_node
+            heapq.heappush(pqs[side], (priority, neighbor))
         
-        return {
-            "step_number": self.step_number,
-            "current_node": self.current_node,
-            "visited_nodes": self.visited_nodes,
-            "frontier_nodes": [[float(priority), int(node)] for priority, node in self.frontier_nodes],
-            "distances": json_distances,  # Use the sanitized distances
-            "previous_nodes": {int(k): int(v) for k, v in self.previous_nodes.items()},
-            "description": self.description,
-            "timestamp": self.timestamp
+        if bidirectional:
+            visited_nodes = list(visited[0] | visited[1])
+            frontier_nodes = pqs[0] + pqs[1]
+            step_distances = {**distances[1], **distances[0]}
+            previous_nodes = {**previous[1], **previous[0]}
+        else:
+            visited_nodes = list(visited[0])
+            frontier_nodes = list(pqs[0])
+            step_distances = dict(distances[0])
+            previous_nodes = dict(previous[0])
+        
+        # Plain Python containers: the API's orjson response encodes the int
+        # keys and tuples directly, with no per-value conversion here
+        yield {
+            "step_number": i + 1,
+            "current_node": steps.current_nodes[i],
+            "visited_nodes": visited_nodes,
+            "frontier_nodes": frontier_nodes,
+            "distances": step_distances,
+            "previous_nodes": previous_nodes,
+            "description": steps.description(i),
+            "timestamp": steps.timestamp(i)
         }
 
 
+def materialize(steps: StepTrace) -> List[Dict[str, Any]]:
+    """All snapshots of one search, see iter_snapshots"""
+    return list(iter_snapshots(steps))
+
+
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate the great circle distance between two points 
@@ -66,17 +197,49 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return c * r
 
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _pairwise_haversine_nb(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        n = len(lat)
+        cos_lat = np.cos(lat)
+        D = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                s_lat = math.sin((lat[i] - lat[j]) / 2)
+                s_lng = math.sin((lng[i] - lng[j]) / 2)
+                a = s_lat * s_lat + cos_lat[i] * cos_lat[j] * s_lng * s_lng
+                D[i, j] = D[j, i] = 2 * 6371 * math.asin(math.sqrt(a))
+        return D
+
+
+def pairwise_haversine(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """
+    (N, N) matrix of great circle distances in kilometers between all pairs
+    of points, computed in one compiled loop (or one NumPy broadcast without
+    Numba) instead of N^2 haversine_distance calls
+    """
+    lat = np.radians(lats)
+    lng = np.radians(lngs)
+    if NUMBA_AVAILABLE:
+        return _pairwise_haversine_nb(lat, lng)
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
 def dijkstra_with_steps(
     graph: Dict[int, List[Tuple[int, float]]], 
     start: int, 
     end: int,
     node_coords: Dict[int, Tuple[float, float]] = None
-) -> Tuple[List[int], float, List[AlgorithmStep]]:
+) -> Tuple[List[int], float, StepTrace]:
     """
     Dijkstra's algorithm implementation with step-by-step execution tracking
     
     Args:
         graph: adjacency list representation {node: [(neighbor, weight), ...]}
+               over node ids 0..N-1
         start: start node
         end: end node
         node_coords: {node: (lat, lng)} for visualization (optional)
@@ -84,65 +247,51 @@ def dijkstra_with_steps(
     Returns:
         (path, distance, steps) tuple
     """
-    distances = {node: float('inf') for node in graph}
+    # Node ids are dense 0..n-1 (see create_realistic_graph), so per-node
+    # state lives in flat lists indexed by id instead of hashed dicts and sets
+    n = len(graph)
+    distances = [math.inf] * n
     distances[start] = 0
-    previous = {}
+    previous = [-1] * n
+    visited = [False] * n
     pq = [(0, start)]
-    visited = set()
-    steps: List[AlgorithmStep] = []
-    step_count = 0
+    # Local aliases skip global and attribute lookups in the hot loop
+    hpush, hpop = heapq.heappush, heapq.heappop
+    graph_get = graph.get
+    steps = StepTrace()
+    visit, relax = steps.visit, steps.relax
     
     while pq:
-        current_distance, current_node = heapq.heappop(pq)
+        current_distance, current_node = hpop(pq)
         
-        if current_node in visited:
+        if visited[current_node]:
             continue
             
-        visited.add(current_node)
+        visited[current_node] = True
         
         # Record step
-        step_count += 1
-        step = AlgorithmStep(
-            step_number=step_count,
-            current_node=current_node,
-            visited_nodes=list(visited),
-            frontier_nodes=[(d, n) for d, n in pq],
-            distances=dict(distances),
-            previous_nodes=dict(previous),
-            description=f"Visiting node {current_node}. Current distance: {current_distance:.2f} km",
-            timestamp=datetime.now().isoformat()
-        )
-        steps.append(step)
+        visit(current_node, "Visiting node %s. Current distance: %.2f km", (current_node, current_distance))
         
         if current_node == end:
             break
             
-        for neighbor, weight in graph.get(current_node, []):
+        for neighbor, weight in graph_get(current_node, []):
             distance = current_distance + weight
             
             if distance < distances[neighbor]:
                 distances[neighbor] = distance
                 previous[neighbor] = current_node
-                heapq.heappush(pq, (distance, neighbor))
+                hpush(pq, (distance, neighbor))
                 
                 # Record exploration step
-                step_count += 1
-                explore_step = AlgorithmStep(
-                    step_number=step_count,
-                    current_node=current_node,
-                    visited_nodes=list(visited),
-                    frontier_nodes=[(d, n) for d, n in pq],
-                    distances=dict(distances),
-                    previous_nodes=dict(previous),
-                    description=f"Exploring neighbor {neighbor} from node {current_node}. New distance: {distance:.2f} km",
-                    timestamp=datetime.now().isoformat()
-                )
-                steps.append(explore_step)
+                relax(current_node, 
+                      "Exploring neighbor %s from node %s. New distance: %.2f km", (neighbor, current_node, distance),
+                      (neighbor, distance, current_node, distance))
     
     # Reconstruct path
     path = []
     current = end
-    while current in previous:
+    while previous[current] != -1:
         path.append(current)
         current = previous[current]
     path.append(start)
@@ -156,12 +305,13 @@ def astar_with_steps(
     node_coords: Dict[int, Tuple[float, float]], 
     start: int, 
     end: int
-) -> Tuple[List[int], float, List[AlgorithmStep]]:
+) -> Tuple[List[int], float, StepTrace]:
     """
     A* algorithm implementation with step-by-step execution tracking
     
     Args:
         graph: adjacency list representation {node: [(neighbor, weight), ...]}
+               over node ids 0..N-1
         node_coords: {node: (lat, lng)} for heuristic calculation
         start: start node
         end: end node
@@ -169,73 +319,70 @@ def astar_with_steps(
     Returns:
         (path, distance, steps) tuple
     """
-    def heuristic(node1: int, node2: int) -> float:
-        """Calculate heuristic distance between two nodes"""
-        lat1, lng1 = node_coords[node1]
-        lat2, lng2 = node_coords[node2]
-        return haversine_distance(lat1, lng1, lat2, lng2)
+    # The goal never changes during a search, so its trig terms are computed
+    # once and each node's estimate is cached the first time it is needed
+    end_lat, end_lng = math.radians(node_coords[end][0]), math.radians(node_coords[end][1])
+    cos_end_lat = math.cos(end_lat)
+    h_cache: Dict[int, float] = {}
+    
+    def heuristic(node: int) -> float:
+        """Haversine distance from node to the goal, in kilometers"""
+        h = h_cache.get(node)
+        if h is None:
+            lat, lng = math.radians(node_coords[node][0]), math.radians(node_coords[node][1])
+            a = math.sin((end_lat - lat) / 2)**2 + math.cos(lat) * cos_end_lat * math.sin((end_lng - lng) / 2)**2
+            h = h_cache[node] = 2 * math.asin(math.sqrt(a)) * 6371
+        return h
     
-    distances = {node: float('inf') for node in graph}
+    # Node ids are dense 0..n-1 (see create_realistic_graph), so per-node
+    # state lives in flat lists indexed by id instead of hashed dicts and sets
+    n = len(graph)
+    distances = [math.inf] * n
     distances[start] = 0
-    previous = {}
+    previous = [-1] * n
+    visited = [False] * n
     pq = [(0, start)]
-    visited = set()
-    steps: List[AlgorithmStep] = []
-    step_count = 0
+    # Local aliases skip global and attribute lookups in the hot loop
+    hpush, hpop = heapq.heappush, heapq.heappop
+    graph_get = graph.get
+    steps = StepTrace()
+    visit, relax = steps.visit, steps.relax
     
     while pq:
-        current_priority, current_node = heapq.heappop(pq)
+        current_priority, current_node = hpop(pq)
         current_distance = distances[current_node]
         
-        if current_node in visited:
+        if visited[current_node]:
             continue
             
-        visited.add(current_node)
+        visited[current_node] = True
         
         # Record step
-        step_count += 1
-        step = AlgorithmStep(
-            step_number=step_count,
-            current_node=current_node,
-            visited_nodes=list(visited),
-            frontier_nodes=[(p, n) for p, n in pq],
-            distances=dict(distances),
-            previous_nodes=dict(previous),
-            description=f"Visiting node {current_node}. Priority: {current_priority:.2f}, Actual distance: {current_distance:.2f} km, Heuristic to goal: {heuristic(current_node, end):.2f} km",
-            timestamp=datetime.now().isoformat()
-        )
-        steps.append(step)
+        visit(current_node, "Visiting node %s. Priority: %.2f, Actual distance: %.2f km, Heuristic to goal: %.2f km",
+              (current_node, current_priority, current_distance, heuristic(current_node)))
         
         if current_node == end:
             break
             
-        for neighbor, weight in graph.get(current_node, []):
+        for neighbor, weight in graph_get(current_node, []):
             distance = distances[current_node] + weight
             
             if distance < distances[neighbor]:
                 distances[neighbor] = distance
                 previous[neighbor] = current_node
-                priority = distance + heuristic(neighbor, end)
-                heapq.heappush(pq, (priority, neighbor))
+                priority = distance + heuristic(neighbor)
+                hpush(pq, (priority, neighbor))
                 
                 # Record exploration step
-                step_count += 1
-                explore_step = AlgorithmStep(
-                    step_number=step_count,
-                    current_node=current_node,
-                    visited_nodes=list(visited),
-                    frontier_nodes=[(p, n) for p, n in pq],
-                    distances=dict(distances),
-                    previous_nodes=dict(previous),
-                    description=f"Exploring neighbor {neighbor} from node {current_node}. New distance: {distance:.2f} km, Priority: {priority:.2f} km",
-                    timestamp=datetime.now().isoformat()
-                )
-                steps.append(explore_step)
+                relax(current_node, 
+                      "Exploring neighbor %s from node %s. New distance: %.2f km, Priority: %.2f km",
+                      (neighbor, current_node, distance, priority),
+                      (neighbor, distance, current_node, priority))
     
     # Reconstruct path
     path = []
     current = end
-    while current in previous:
+    while previous[current] != -1:
         path.append(current)
         current = previous[current]
     path.append(start)
@@ -244,6 +391,128 @@ def astar_with_steps(
     return path, distances[end], steps
 
 
+def astar_bidirectional_with_steps(
+    graph: Dict[int, List[Tuple[int, float]]], 
+    node_coords: Dict[int, Tuple[float, float]], 
+    start: int, 
+    end: int
+) -> Tuple[List[int], float, StepTrace]:
+    """
+    Bidirectional A* with step-by-step execution tracking: one A* search runs
+    forward from start toward end and another backward over the reversed edges
+    from end toward start, and they stop once neither frontier can beat the
+    best path found through a node both have reached
+    
+    Args:
+        graph: adjacency list representation {node: [(neighbor, weight), ...]}
+               over node ids 0..N-1
+        node_coords: {node: (lat, lng)} for heuristic calculation
+        start: start node
+        end: end node
+        
+    Returns:
+        (path, distance, steps) tuple; steps carry side 0 (forward) or 1 (backward)
+    """
+    if start == end:
+        return [start], 0, StepTrace()
+    
+    n = len(graph)
+    rev_graph: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+    for node, neighbors in graph.items():
+        for neighbor, weight in neighbors:
+            rev_graph[neighbor].append((node, weight))
+    
+    # Each side aims at the other side's origin; both estimates are cached
+    coords = np.radians(np.array([node_coords[i] for i in range(n)], dtype=np.float64))
+    h = []
+    for target in (end, start):
+        a = (np.sin((coords[target, 0] - coords[:, 0]) / 2) ** 2
+             + np.cos(coords[:, 0]) * np.cos(coords[target, 0]) * np.sin((coords[target, 1] - coords[:, 1]) / 2) ** 2)
+        h.append((2 * 6371 * np.arcsin(np.sqrt(a))).tolist())
+    
+    adjacency = (lambda node: graph.get(node, []), rev_graph.__getitem__)
+    distances = ([math.inf] * n, [math.inf] * n)
+    links = ([-1] * n, [-1] * n)  # previous node toward start / next node toward end
+    visited = ([False] * n, [False] * n)
+    pqs = ([(0, start)], [(0, end)])
+    distances[0][start] = 0
+    distances[1][end] = 0
+    labels = ("forward", "backward")
+    hpush, hpop = heapq.heappush, heapq.heappop
+    steps = StepTrace()
+    # Length of the best start -> meet -> end path seen so far
+    best = math.inf
+    meet = -1
+    
+    while pqs[0] and pqs[1]:
+        # With consistent heuristics, no path through an unsettled node is
+        # shorter than either frontier's smallest priority
+        if max(pqs[0][0][0], pqs[1][0][0]) >= best:
+            break
+        
+        # Expand the smaller open set
+        side = 0 if len(pqs[0]) <= len(pqs[1]) else 1
+        pq, dist, link, seen, h_side = pqs[side], distances[side], links[side], visited[side], h[side]
+        other_dist = distances[1 - side]
+        
+        current_priority, current_node = hpop(pq)
+        if seen[current_node]:
+            continue
+        seen[current_node] = True
+        current_distance = dist[current_node]
+        
+        steps.visit(current_node, 
+                    "Visiting node %s (%s search). Priority: %.2f, Actual distance: %.2f km, Heuristic: %.2f km",
+                    (current_node, labels[side], current_priority, current_distance, h_side[current_node]),
+                    side)
+        
+        for neighbor, weight in adjacency[side](current_node):
+            distance = current_distance + weight
+            
+            if distance < dist[neighbor]:
+                dist[neighbor] = distance
+                link[neighbor] = current_node
+                priority = distance + h_side[neighbor]
+                hpush(pq, (priority, neighbor))
+                
+                steps.relax(current_node, 
+                            "Exploring neighbor %s from node %s (%s search). New distance: %.2f km, Priority: %.2f km",
+                            (neighbor, current_node, labels[side], distance, priority),
+                            (neighbor, distance, current_node, priority), side)
+            
+            if dist[neighbor] + other_dist[neighbor] < best:
+                best = dist[neighbor] + other_dist[neighbor]
+                meet = neighbor
+    
+    if meet == -1:
+        return [start], math.inf, steps
+    
+    # Splice the forward chain start -> meet with the backward chain meet -> end
+    path = [meet]
+    while path[-1] != start:
+        path.append(links[0][path[-1]])
+    path.reverse()
+    while path[-1] != end:
+        path.append(links[1][path[-1]])
+    
+    return path, best, steps
+
+
+def search_with_steps(
+    algorithm: str,
+    graph: Dict[int, List[Tuple[int, float]]], 
+    node_coords: Dict[int, Tuple[float, float]], 
+    start: int, 
+    end: int
+) -> Tuple[List[int], float, StepTrace]:
+    """Run the step-tracking search named by algorithm ("dijkstra", "astar" or "astar_bidir")"""
+    if algorithm == "astar":
+        return astar_with_steps(graph, node_coords, start, end)
+    if algorithm == "astar_bidir":
+        return astar_bidirectional_with_steps(graph, node_coords, start, end)
+    return dijkstra_with_steps(graph, start, end, node_coords)
+
+
 def create_realistic_graph(locations: List[Dict[str, Any]]) -> Tuple[Dict[int, List[Tuple[int, float]]], Dict[int, Tuple[float, float]]]:
     """
     Create a more realistic graph where nodes are connected to nearby nodes only,
@@ -259,39 +528,54 @@ def create_realistic_graph(locations: List[Dict[str, Any]]) -> Tuple[Dict[int, L
         graph[node_id] = []
     
     # Connect each node to its nearest neighbors only
-    for i in range(len(locations)):
-        distances_to_others = []
-        for j in range(len(locations)):
-            if i != j:
-                distance = haversine_distance(
-                    locations[i]['lat'], locations[i]['lng'],
-                    locations[j]['lat'], locations[j]['lng']
-                )
-                distances_to_others.append((distance, j))
-        
-        # Sort by distance and connect to nearest 2-3 neighbors
-        distances_to_others.sort()
-        num_connections = min(3, len(distances_to_others))  # Connect to at most 3 nearest neighbors
-        
-        for k in range(num_connections):
-            distance, neighbor_id = distances_to_others[k]
-            # Make sure neighbor_id is an integer
-            neighbor_id = int(neighbor_id)
-            graph[i].append((neighbor_id, distance))
+    lats = np.array([loc['lat'] for loc in locations], dtype=np.float64)
+    lngs = np.array([loc['lng'] for loc in locations], dtype=np.float64)
+    D = pairwise_haversine(lats, lngs)
+    num_connections = min(3, len(locations) - 1)  # Connect to at most 3 nearest neighbors
+    
+    if num_connections > 0:
+        # Partition each row in O(N) instead of sorting it: the node itself
+        # (distance 0) plus its nearest neighbors land in the first k columns
+        k = num_connections + 1
+        candidates = np.argpartition(D, min(k, len(D)) - 1, axis=1)[:, :k]
+        for i, row in enumerate(candidates):
+            row = row[row != i]
+            # Order the few candidates by distance, lower id first on ties
+            nearest = row[np.lexsort((row, D[i, row]))][:num_connections]
+            graph[i] = [(int(j), float(D[i, j])) for j in nearest]
     
     return graph, node_coords
 
 
+@functools.lru_cache(maxsize=1024)
+def _cached_realistic_graph(coords: Tuple[Tuple[float, float], ...]) -> Tuple[
+    Dict[int, List[Tuple[int, float]]], 
+    Dict[int, Tuple[float, float]]
+]:
+    return create_realistic_graph([{'lat': lat, 'lng': lng} for lat, lng in coords])
+
+
+def realistic_graph_for(locations: List[Dict[str, Any]]) -> Tuple[
+    Dict[int, List[Tuple[int, float]]], 
+    Dict[int, Tuple[float, float]]
+]:
+    """
+    create_realistic_graph, reusing the graph built for an earlier request
+    with the same coordinates. The result is shared and must not be modified.
+    """
+    return _cached_realistic_graph(tuple((loc['lat'], loc['lng']) for loc in locations))
+
+
 def solve_route_with_multiple_stops(
     locations: List[Dict[str, Any]],  # List of {id, lat, lng}
-    algorithm: str = "dijkstra"  # "dijkstra" or "astar"
+    algorithm: str = "dijkstra"  # "dijkstra", "astar" or "astar_bidir"
 ) -> Dict[str, Any]:
     """
     Solve route with multiple stops using specified algorithm
     
     Args:
         locations: List of locations in order [pickup, stop1, stop2, ..., dropoff]
-        algorithm: Algorithm to use ("dijkstra", "astar")
+        algorithm: Algorithm to use ("dijkstra", "astar", "astar_bidir")
         
     Returns:
         Dictionary with route information and algorithm steps
@@ -300,14 +584,13 @@ def solve_route_with_multiple_stops(
         raise ValueError("Need at least pickup and dropoff locations")
     
     # Create a more realistic graph where nodes are only connected to nearby nodes
-    graph, node_coords = create_realistic_graph(locations)
+    graph, node_coords = realistic_graph_for(locations)
     location_map = {loc['id']: i for i, loc in enumerate(locations)}
     
     # Determine start and end nodes
     start_node = location_map[locations[0]['id']]
     end_node = location_map[locations[-1]['id']]
     
-    import time
     start_time = time.time()
     
     # For multiple stops, we need to visit them in order
@@ -323,24 +606,20 @@ def solve_route_with_multiple_stops(
             segment_start = location_map[locations[i]['id']]
             segment_end = location_map[locations[i+1]['id']]
             
-            if algorithm == "astar":
-                path_segment, segment_distance, steps = astar_with_steps(
-                    graph, node_coords, segment_start, segment_end
-                )
-            else:  # dijkstra
-                path_segment, segment_distance, steps = dijkstra_with_steps(
-                    graph, segment_start, segment_end, node_coords
-                )
+            path_segment, segment_distance, steps = search_with_steps(
+                algorithm, graph, node_coords, segment_start, segment_end
+            )
             
+            segment_steps = materialize(steps)
             segments.append({
                 "from": locations[i]['id'],
                 "to": locations[i+1]['id'],
                 "path": path_segment,
                 "distance_km": segment_distance,
-                "steps": [step.to_dict() for step in steps]
+                "steps": segment_steps
             })
             
-            steps_collection.extend(steps)
+            steps_collection.extend(segment_steps)
             total_distance += segment_distance
             
             # Add segment path to complete path (avoid duplicating nodes)
@@ -365,19 +644,14 @@ def solve_route_with_multiple_stops(
             "coordinates": coordinates,
             "distance_km": total_distance,
             "eta_min": total_distance * 2,  # Simple estimation
-            "steps": [step.to_dict() for step in steps_collection],
+            "steps": steps_collection,
             "execution_time_ms": execution_time
         }
     else:
         # Direct route from pickup to dropoff
-        if algorithm == "astar":
-            path, distance, steps = astar_with_steps(
-                graph, node_coords, start_node, end_node
-            )
-        else:  # dijkstra
-            path, distance, steps = dijkstra_with_steps(
-                graph, start_node, end_node, node_coords
-            )
+        path, distance, steps = search_with_steps(
+            algorithm, graph, node_coords, start_node, end_node
+        )
         
         # Convert node IDs back to coordinates for GeoJSON
         coordinates = []
@@ -394,11 +668,53 @@ def solve_route_with_multiple_stops(
             "coordinates": coordinates,
             "distance_km": distance,
             "eta_min": distance * 2,  # Simple estimation
-            "steps": [step.to_dict() for step in steps],
+            "steps": materialize(steps),
             "execution_time_ms": execution_time
         }
 
 
+def stream_route_steps(
+    locations: List[Dict[str, Any]],  # List of {id, lat, lng}
+    algorithm: str = "dijkstra"  # "dijkstra", "astar" or "astar_bidir"
+) -> Iterator[Dict[str, Any]]:
+    """
+    Solve route with multiple stops like solve_route_with_multiple_stops, but
+    yield each step snapshot as soon as its segment is searched instead of
+    collecting them all into one result
+    
+    Yields:
+        {"type": "step", "segment": i, "step": snapshot} for every step, then
+        one {"type": "result", ...} with the route and no steps
+    """
+    if len(locations) < 2:
+        raise ValueError("Need at least pickup and dropoff locations")
+    
+    graph, node_coords = realistic_graph_for(locations)
+    start_time = time.time()
+    total_distance = 0
+    complete_path = [0]
+    
+    # Segments pickup -> stop1 -> ... -> dropoff; node ids are location indices
+    for i in range(len(locations) - 1):
+        path_segment, segment_distance, steps = search_with_steps(algorithm, graph, node_coords, i, i + 1)
+        
+        for snapshot in iter_snapshots(steps):
+            yield {"type": "step", "segment": i, "step": snapshot}
+        
+        total_distance += segment_distance
+        complete_path.extend(path_segment[1:])
+    
+    yield {
+        "type": "result",
+        "algorithm": algorithm,
+        "complete_path": complete_path,
+        "coordinates": [[node_coords[n][1], node_coords[n][0]] for n in complete_path],  # GeoJSON [lng, lat]
+        "distance_km": total_distance,
+        "eta_min": total_distance * 2,  # Simple estimation
+        "execution_time_ms": (time.time() - start_time) * 1000
+    }
+
+
 # Example usage and testing
 if __name__ == "__main__":
     # Test with sample data
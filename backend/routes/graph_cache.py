@@ -0,0 +1,29 @@
+"""
+Redis cache of subgraph edges shared by the API and the route worker:
+both read and write the same keys, so a fetch on either side warms the other.
+Edges are stored as compact [id, from_node, to_node, distance_km,
+travel_time_min] rows rather than full row objects, keeping values small.
+"""
+
+import hashlib
+from typing import List, Dict, Any
+
+import orjson
+
+SUBGRAPH_EDGES_TTL = 300
+
+EDGE_FIELDS = ("id", "from_node", "to_node", "distance_km", "travel_time_min")
+
+
+def subgraph_edges_key(node_ids: List[int]) -> str:
+    """Cache key for the subgraph over a set of node ids, independent of their order"""
+    digest = hashlib.blake2b(str(sorted(set(node_ids))).encode(), digest_size=8).hexdigest()
+    return f"subgraph:{digest}"
+
+
+def encode_edges(edges: List[Dict[str, Any]]) -> bytes:
+    return orjson.dumps([[edge.get(field) for field in EDGE_FIELDS] for edge in edges])
+
+
+def decode_edges(raw: bytes) -> List[Dict[str, Any]]:
+    return [dict(zip(EDGE_FIELDS, row)) for row in orjson.loads(raw)]
@@ -5,10 +5,11 @@ Test script for the enhanced pathfinding algorithms
 import sys
 import os
 
-# Add the routes directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'routes'))
+# Add the backend directory to the path; importing routes.enhanced_algorithms
+# under the same name as the API keeps the shared Numba kernel cache valid
+sys.path.insert(0, os.path.dirname(__file__))
 
-from enhanced_algorithms import solve_route_with_multiple_stops, create_realistic_graph, haversine_distance
+from routes.enhanced_algorithms import solve_route_with_multiple_stops, create_realistic_graph, haversine_distance
 
 def test_algorithms_with_complex_graph():
     """Test the enhanced algorithms with a more complex scenario"""
@@ -104,9 +105,14 @@ def test_simple_direct_comparison():
     # Test both algorithms
     result_dijkstra = solve_route_with_multiple_stops(locations, "dijkstra")
     result_astar = solve_route_with_multiple_stops(locations, "astar")
+    result_bidir = solve_route_with_multiple_stops(locations, "astar_bidir")
     
     print(f"\nDijkstra steps: {len(result_dijkstra['steps'])}")
     print(f"A* steps: {len(result_astar['steps'])}")
+    print(f"Bidirectional A* steps: {len(result_bidir['steps'])}")
+    
+    # All three searches are exact, so they must agree on the distance
+    assert abs(result_bidir['distance_km'] - result_dijkstra['distance_km']) < 1e-9
     
     if len(result_dijkstra['steps']) > len(result_astar['steps']):
         print("✓ A* was more efficient (explored fewer nodes)")
@@ -4,14 +4,30 @@ Script to seed Supabase database with sample graph data
 
 import csv
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import orjson
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+def insert_rows(supabase: Client, table: str, rows: list) -> None:
+    """
+    Insert rows into a table through the client's PostgREST session, with the
+    payload encoded by orjson rather than the client's json.dumps
+    """
+    response = supabase.postgrest.session.post(
+        table,
+        content=orjson.dumps(rows),
+        headers={'Content-Type': 'application/json', 'Prefer': 'return=minimal'}
+    )
+    response.raise_for_status()
+
 def seed_nodes_and_edges():
-    """Seed nodes and edges tables with sample data"""
+    """Seed nodes and edges tables with sample data; returns True on success"""
     
     # Initialize Supabase client
     url = os.getenv("SUPABASE_URL")
@@ -19,7 +35,7 @@ def seed_nodes_and_edges():
     
     if not url or not key:
         print("Error: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in environment variables")
-        return
+        return False
     
     supabase: Client = create_client(url, key)
     
@@ -36,11 +52,11 @@ def seed_nodes_and_edges():
     
     # Insert nodes
     try:
-        response = supabase.table('nodes').insert(nodes).execute()
+        insert_rows(supabase, 'nodes', nodes)
         print(f"Inserted {len(nodes)} nodes")
     except Exception as e:
         print(f"Error inserting nodes: {e}")
-        return
+        return False
     
     # Create sample edges (undirected graph - insert both directions)
     edges = []
@@ -53,18 +69,16 @@ def seed_nodes_and_edges():
         (1, 7), (2, 8), (3, 9), (4, 10), (5, 1)
     ]
     
-    for from_node, to_node in connections:
-        # Calculate distance between nodes
-        from_node_data = next(n for n in nodes if n['id'] == from_node)
-        to_node_data = next(n for n in nodes if n['id'] == to_node)
-        
-        # Simple Euclidean distance approximation (in km)
-        import math
-        distance = math.sqrt(
-            (from_node_data['lat'] - to_node_data['lat'])**2 + 
-            (from_node_data['lng'] - to_node_data['lng'])**2
-        ) * 111  # Rough conversion to km
-        
+    # Look nodes up by id once instead of scanning the list for every edge
+    node_by_id = {n['id']: n for n in nodes}
+    lat1, lng1 = np.radians([(node_by_id[a]['lat'], node_by_id[a]['lng']) for a, _ in connections]).T
+    lat2, lng2 = np.radians([(node_by_id[b]['lat'], node_by_id[b]['lng']) for _, b in connections]).T
+    
+    # Great circle (haversine) distance in km, all edges at once
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2)**2
+    distances = 2 * 6371 * np.arcsin(np.sqrt(a))
+    
+    for (from_node, to_node), distance in zip(connections, distances.tolist()):
         # Add both directions for undirected graph
         edges.append({
             'id': edge_id,
@@ -86,17 +100,19 @@ def seed_nodes_and_edges():
     
     # Insert edges
     try:
-        # Insert in batches of 100 to avoid timeouts
+        # Insert in batches of 100 to avoid timeouts, sending the batches
+        # concurrently rather than waiting on one round trip at a time
         batch_size = 100
-        for i in range(0, len(edges), batch_size):
-            batch = edges[i:i+batch_size]
-            response = supabase.table('edges').insert(batch).execute()
+        batches = [edges[i:i+batch_size] for i in range(0, len(edges), batch_size)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda batch: insert_rows(supabase, 'edges', batch), batches))
         print(f"Inserted {len(edges)} edges")
     except Exception as e:
         print(f"Error inserting edges: {e}")
-        return
+        return False
     
     print("Seeding completed successfully!")
+    return True
 
 if __name__ == "__main__":
     seed_nodes_and_edges()
\ No newline at end of file
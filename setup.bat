@@ -8,6 +8,11 @@ echo Installing backend dependencies...
 call backend\venv\Scripts\activate
 pip install -r backend/requirements.txt
 
+echo Precompiling route algorithm kernels...
+cd backend
+python compile_kernels.py
+cd ..
+
 echo Installing frontend dependencies...
 cd frontend
 npm install
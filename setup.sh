@@ -11,6 +11,10 @@ echo "Installing backend dependencies..."
 source backend/venv/bin/activate
 pip install -r backend/requirements.txt
 
+# Compile the route kernels once so the first request doesn't wait on it
+echo "Precompiling route algorithm kernels..."
+(cd backend && python compile_kernels.py)
+
 # Install frontend dependencies
 echo "Installing frontend dependencies..."
 cd frontend
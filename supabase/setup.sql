@@ -67,6 +67,37 @@ CREATE TABLE IF NOT EXISTS edges (
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_edges_from_node ON edges(from_node);
 CREATE INDEX IF NOT EXISTS idx_edges_to_node ON edges(to_node);
+CREATE INDEX IF NOT EXISTS idx_edges_from_to ON edges(from_node, to_node);
+
+-- Point geometry for nearest-node searches, kept in sync with lat/lng and
+-- indexed with GiST (an R-tree) so ORDER BY geom <-> point LIMIT 1 is a KNN scan
+CREATE EXTENSION IF NOT EXISTS postgis;
+ALTER TABLE nodes ADD COLUMN IF NOT EXISTS geom geometry(Point, 4326)
+  GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(lng::float8, lat::float8), 4326)) STORED;
+CREATE INDEX IF NOT EXISTS nodes_geom_gist ON nodes USING GIST (geom);
+
+-- Nearest node to a single point. The arguments are qualified with the
+-- function name because the nodes columns of the same name would shadow them
+CREATE OR REPLACE FUNCTION find_nearest_node(lat DOUBLE PRECISION, lng DOUBLE PRECISION)
+RETURNS SETOF nodes AS $$
+  SELECT * FROM nodes
+  ORDER BY geom <-> ST_SetSRID(ST_MakePoint(find_nearest_node.lng, find_nearest_node.lat), 4326)
+  LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+-- Nearest node for each of a batch of {lat, lng} points, returned in input order
+CREATE OR REPLACE FUNCTION find_nearest_nodes(coords JSONB)
+RETURNS SETOF nodes AS $$
+  SELECT n.*
+  FROM ROWS FROM (jsonb_to_recordset(coords) AS (lat DOUBLE PRECISION, lng DOUBLE PRECISION))
+    WITH ORDINALITY AS c(lat, lng, ord)
+  CROSS JOIN LATERAL (
+    SELECT * FROM nodes
+    ORDER BY nodes.geom <-> ST_SetSRID(ST_MakePoint(c.lng, c.lat), 4326)
+    LIMIT 1
+  ) n
+  ORDER BY c.ord;
+$$ LANGUAGE sql STABLE;
 
 -- Enable Row Level Security (RLS) for all tables
 ALTER TABLE route_calculations ENABLE ROW LEVEL SECURITY;
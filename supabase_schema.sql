@@ -14,6 +14,9 @@ create table if not exists edges (
   travel_time_min double precision
 );
 
+-- subgraph queries filter on both endpoints (from_node in (...) and to_node in (...))
+create index if not exists edges_from_to_idx on edges (from_node, to_node);
+
 -- jobs table (async tasks)
 create table if not exists jobs (
   job_id text primary key,
@@ -5,8 +5,6 @@ Run this script after setting up your Supabase credentials
 
 import os
 from dotenv import load_dotenv
-import subprocess
-import sys
 
 def check_env_variables():
     """Check if Supabase environment variables are set"""
@@ -33,15 +31,13 @@ def seed_database():
     """Run the database seeding script"""
     try:
         print("🌱 Seeding database with sample data...")
-        result = subprocess.run([sys.executable, 'seed_supabase.py'], 
-                              capture_output=True, text=True, cwd='.')
-        if result.returncode == 0:
+        # Imported here so the other actions don't pay for the Supabase client
+        from seed_supabase import seed_nodes_and_edges
+        if seed_nodes_and_edges():
             print("✅ Database seeding completed successfully")
-            print(result.stdout)
             return True
         else:
             print("❌ Database seeding failed")
-            print(result.stderr)
             return False
     except Exception as e:
         print(f"❌ Error running seed script: {e}")
@@ -4,11 +4,18 @@ Simple test script to verify frontend-backend connection
 
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# One keep-alive connection pool to the backend shared by every check,
+# instead of a new connection per request
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
 
 def test_backend_health():
     """Test if backend is running and healthy"""
     try:
-        response = requests.get('http://localhost:8000/health')
+        response = session.get('http://localhost:8000/health')
         if response.status_code == 200:
             print("✅ Backend is running and healthy")
             return True
@@ -22,8 +29,8 @@ def test_backend_health():
 def test_cors():
     """Test CORS configuration"""
     try:
-        response = requests.options('http://localhost:8000/api/v1/routes/estimate', 
-                                 headers={'Origin': 'http://localhost:3000'})
+        response = session.options('http://localhost:8000/api/v1/routes/estimate', 
+                                headers={'Origin': 'http://localhost:3000'})
         if 'access-control-allow-origin' in response.headers:
             print("✅ CORS is properly configured")
             return True
@@ -47,9 +54,9 @@ def test_route_estimation():
             "async_mode": False
         }
         
-        response = requests.post('http://localhost:8000/api/v1/routes/estimate', 
-                               json=payload,
-                               headers={'Content-Type': 'application/json'})
+        response = session.post('http://localhost:8000/api/v1/routes/estimate', 
+                              json=payload,
+                              headers={'Content-Type': 'application/json'})
         
         if response.status_code == 200:
             print("✅ Route estimation endpoint is working")
@@ -72,8 +79,13 @@ if __name__ == "__main__":
     
     # Run tests
     backend_ok = test_backend_health()
-    cors_ok = test_cors() if backend_ok else False
-    route_ok = test_route_estimation() if backend_ok else False
+    cors_ok = route_ok = False
+    if backend_ok:
+        # The remaining checks are independent, so they run side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            cors_future = executor.submit(test_cors)
+            route_future = executor.submit(test_route_estimation)
+            cors_ok, route_ok = cors_future.result(), route_future.result()
     
     print("\n" + "=" * 50)
     if backend_ok and cors_ok and route_ok:
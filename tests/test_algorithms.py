@@ -6,12 +6,19 @@ import pytest
 import sys
 import os
 
+import numpy as np
+
 # Add backend to path so we can import algorithms
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from routes.algorithms import (
     haversine_distance, 
+    haversine_path_km,
+    haversine_matrix,
     dijkstra, 
+    bidirectional_dijkstra,
+    build_csr,
+    dijkstra_csr,
     astar, 
     nearest_neighbor, 
     two_opt, 
@@ -30,6 +37,31 @@ def test_haversine_distance():
     assert abs(dist - 5.6) < 0.5  # Approximately 5.6 km
 
 
+def test_haversine_path_km():
+    """Test vectorized polyline length matches the per-segment sum"""
+    points = [(12.9716, 77.5946), (12.9352, 77.6245), (12.9716, 77.6245)]
+    expected = sum(
+        haversine_distance(*points[i], *points[i + 1]) for i in range(len(points) - 1)
+    )
+    assert abs(haversine_path_km(points) - expected) < 1e-9
+    
+    # Fewer than two points has no length
+    assert haversine_path_km(points[:1]) == 0.0
+
+
+def test_haversine_matrix():
+    """Test all-pairs distance matrix against the scalar haversine"""
+    lats = [12.9716, 12.9352, 12.9716]
+    lngs = [77.5946, 77.6245, 77.6245]
+    D = haversine_matrix(lats, lngs)
+    
+    assert D.shape == (3, 3)
+    for i in range(3):
+        assert D[i, i] == 0
+        for j in range(3):
+            assert abs(D[i, j] - haversine_distance(lats[i], lngs[i], lats[j], lngs[j])) < 1e-9
+
+
 def test_dijkstra_basic():
     """Test basic Dijkstra algorithm"""
     # Simple graph: 0 -> 1 -> 2
@@ -59,6 +91,43 @@ def test_dijkstra_complex():
     assert distance == 3  # 0->2 (1) + 2->1 (2) + 1->3 (1) = 4
 
 
+def test_bidirectional_dijkstra():
+    """Test bidirectional Dijkstra matches one-sided Dijkstra"""
+    graph = {
+        0: [(1, 4), (2, 1)],
+        1: [(3, 1)],
+        2: [(1, 2), (3, 5)],
+        3: [],
+        4: [(0, 1)]
+    }
+    
+    for end in range(5):
+        path, distance = bidirectional_dijkstra(graph, 0, end)
+        expected_path, expected_distance = dijkstra(graph, 0, end)
+        assert distance == expected_distance
+        assert path == expected_path
+    # Node 4 only has an edge into the graph, so it is unreachable from 0
+    assert bidirectional_dijkstra(graph, 0, 4) == ([0], float('inf'))
+
+
+def test_dijkstra_csr():
+    """Test Dijkstra over CSR arrays matches the adjacency list version"""
+    graph = {
+        10: [(20, 4), (30, 1)],
+        20: [(40, 1)],
+        30: [(20, 2), (40, 5)],
+        50: [(10, 1)]
+    }
+    csr = build_csr(graph)
+    
+    for start in (10, 50):
+        for end in (10, 20, 30, 40, 50):
+            assert dijkstra_csr(csr, start, end) == dijkstra(graph, start, end)
+    # Node 40 has no out-edges and 60 is not in the graph at all
+    assert dijkstra_csr(csr, 40, 10) == ([40], float('inf'))
+    assert dijkstra_csr(csr, 60, 10) == ([60], float('inf'))
+
+
 def test_astar_basic():
     """Test basic A* algorithm"""
     # Simple graph with coordinates
@@ -140,5 +209,25 @@ def test_nn_plus_2opt():
     assert len(set(tour)) >= 4  # All unique nodes plus return
 
 
+def test_nn_plus_2opt_dense_matrix():
+    """Test NN + 2-opt over a dense matrix matches the dict version"""
+    nodes = [10, 11, 12, 13]
+    D = np.array([
+        [0, 1, 2, 3],
+        [1, 0, 1, 1],
+        [2, 1, 0, 1],
+        [3, 1, 1, 0]
+    ], dtype=float)
+    distance_matrix = {
+        (nodes[i], nodes[j]): D[i, j] for i in range(4) for j in range(4) if i != j
+    }
+    
+    tour, distance = nn_plus_2opt(nodes, D)
+    # Tour is in node IDs, starting and ending at the first node
+    assert tour[0] == tour[-1] == 10
+    assert sorted(tour[:-1]) == nodes
+    assert distance == nn_plus_2opt(nodes, distance_matrix)[1]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
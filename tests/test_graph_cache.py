@@ -0,0 +1,35 @@
+"""
+Unit tests for the shared subgraph edge cache encoding
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path so we can import the cache helpers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from routes.graph_cache import subgraph_edges_key, encode_edges, decode_edges
+
+
+def test_subgraph_edges_key():
+    """Test the key depends only on the set of node ids"""
+    assert subgraph_edges_key([3, 1, 2]) == subgraph_edges_key([1, 2, 3, 3])
+    assert subgraph_edges_key([1, 2]) != subgraph_edges_key([1, 3])
+
+
+def test_encode_decode_edges():
+    """Test edges survive the compact encoding with only the stored fields"""
+    edges = [
+        {"id": 7, "from_node": 1, "to_node": 2, "distance_km": 1.5, "travel_time_min": 3.0},
+        {"id": 8, "from_node": 2, "to_node": 1, "distance_km": 1.5, "travel_time_min": None,
+         "created_at": "2024-01-01T00:00:00Z"}
+    ]
+    decoded = decode_edges(encode_edges(edges))
+    assert decoded[0] == edges[0]
+    assert decoded[1] == {"id": 8, "from_node": 2, "to_node": 1, "distance_km": 1.5, "travel_time_min": None}
+    assert decode_edges(encode_edges([])) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
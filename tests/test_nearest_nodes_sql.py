@@ -0,0 +1,66 @@
+"""
+Integration tests for the nearest-node SQL functions in supabase/setup.sql.
+They need a database with setup.sql applied, reached through SUPABASE_DB_URL,
+and asyncpg; otherwise they are skipped. Test nodes are inserted inside a
+transaction that is rolled back.
+"""
+
+import asyncio
+import json
+import pytest
+import os
+
+asyncpg = pytest.importorskip("asyncpg")
+
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+
+pytestmark = pytest.mark.skipif(not SUPABASE_DB_URL, reason="SUPABASE_DB_URL not set")
+
+# Well away from the sample Bangalore nodes, so each test point's nearest
+# node is the one inserted at (almost) the same position
+TEST_POINTS = [(-45.10, 170.10), (-45.20, 170.40), (-45.30, 170.20), (-45.40, 170.50)]
+
+
+async def with_test_nodes(check):
+    conn = await asyncpg.connect(SUPABASE_DB_URL)
+    try:
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            ids = [
+                await conn.fetchval(
+                    "INSERT INTO nodes (lat, lng, name) VALUES ($1, $2, 'test node') RETURNING id", lat, lng
+                )
+                for lat, lng in TEST_POINTS
+            ]
+            await check(conn, ids)
+        finally:
+            await tx.rollback()
+    finally:
+        await conn.close()
+
+
+def test_find_nearest_nodes_keeps_input_order():
+    """Test the batched lookup returns one node per point, in the order the points were given"""
+    order = [2, 0, 3, 1, 0]
+
+    async def check(conn, ids):
+        coords = [{"lat": TEST_POINTS[i][0] + 0.001, "lng": TEST_POINTS[i][1] - 0.001} for i in order]
+        rows = await conn.fetch("SELECT id FROM find_nearest_nodes($1::jsonb)", json.dumps(coords))
+        assert [row["id"] for row in rows] == [ids[i] for i in order]
+
+    asyncio.run(with_test_nodes(check))
+
+
+def test_find_nearest_node_uses_arguments():
+    """Test the single-point lookup measures from the given point, not from each row's own position"""
+    async def check(conn, ids):
+        for i, (lat, lng) in enumerate(TEST_POINTS):
+            row = await conn.fetchrow("SELECT id FROM find_nearest_node($1, $2)", lat + 0.001, lng - 0.001)
+            assert row["id"] == ids[i]
+
+    asyncio.run(with_test_nodes(check))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
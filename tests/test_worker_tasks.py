@@ -0,0 +1,147 @@
+"""
+Unit tests for the route worker's job processing
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+import os
+from collections import OrderedDict
+
+# Add worker to path so we can import the tasks module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'worker'))
+
+import tasks
+
+
+class FakeRedis:
+    """In-memory stand-in for the few Redis commands the worker uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def publish(self, channel, message):
+        return 0
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        # select/eq/in_/order/limit/update just chain
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return FakeResponse(self._data)
+
+
+class FakeDB:
+    """Supabase client over two nodes joined by one edge"""
+
+    nodes = [{"id": 1, "lat": 12.97, "lng": 77.59}, {"id": 2, "lat": 12.93, "lng": 77.62}]
+    edges = [{"id": 1, "from_node": 1, "to_node": 2, "distance_km": 5.5, "travel_time_min": 9}]
+
+    def rpc(self, name, params):
+        return FakeQuery(self.nodes)
+
+    def table(self, name):
+        return FakeQuery(self.edges if name == "edges" else [])
+
+
+class UnreachableDB:
+    def rpc(self, name, params):
+        raise ConnectionError("database unreachable")
+
+    def table(self, name):
+        raise ConnectionError("database unreachable")
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis_client)
+    monkeypatch.setattr(tasks, "recent_subgraphs", OrderedDict())
+    monkeypatch.setattr(tasks, "SUPABASE_DB_URL", None)
+
+    async def no_osrm(start_coords, end_coords):
+        return None
+
+    async def no_webhook(job_data):
+        return None
+
+    monkeypatch.setattr(tasks, "get_osrm_route", no_osrm)
+    monkeypatch.setattr(tasks, "post_to_n8n_webhook", no_webhook)
+    return redis_client
+
+
+def run_job(params):
+    asyncio.run(tasks.process_job("job_test", params))
+
+
+def route_params(algorithm, stops=()):
+    return {
+        "user_id": "u_123",
+        "pickup": {"lat": 12.97, "lng": 77.59},
+        "dropoff": {"lat": 12.93, "lng": 77.62},
+        "stops": list(stops),
+        "optimize_for": "time",
+        "algorithm": algorithm
+    }
+
+
+def test_route_result_cached(worker, monkeypatch):
+    """Test a route computed from the database is cached for identical jobs"""
+    monkeypatch.setattr(tasks, "supabase", FakeDB())
+    params = route_params("dijkstra")
+    run_job(params)
+
+    cached = worker.get(tasks.route_cache_key(params))
+    assert cached is not None
+    assert json.loads(cached)["distance_km"] == 5.5
+
+
+@pytest.mark.parametrize("algorithm, stops", [
+    ("dijkstra", []),
+    ("nn+2opt", [{"lat": 12.95, "lng": 77.60}])
+])
+def test_fallback_route_not_cached(worker, monkeypatch, algorithm, stops):
+    """Test routes built on mock nodes/edges while the database is down are not cached"""
+    monkeypatch.setattr(tasks, "supabase", UnreachableDB())
+    params = route_params(algorithm, stops)
+    run_job(params)
+
+    assert worker.get(tasks.route_cache_key(params)) is None
+    assert not any(key.startswith("route:") for key in worker.data)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -4,14 +4,24 @@ Celery worker tasks for asynchronous route computation
 
 import os
 import json
-import requests
+import hashlib
+import orjson
 import httpx  # Add this import for OSRM routing
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from dotenv import load_dotenv
 import sys
 import asyncio
+import time
+import numpy as np
+from collections import OrderedDict
+import redis
 from supabase import create_client, Client
-from typing import Dict, Any, List  # Add missing imports
+try:
+    import asyncpg
+except ImportError:  # asyncpg is optional - job and edge queries then go through PostgREST
+    asyncpg = None
+from typing import Dict, Any, List, Optional, Tuple  # Add missing imports
 
 # Add backend to path so we can import algorithms
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
@@ -19,19 +29,36 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client
-supabase: Client = create_client(
-    os.environ.get("SUPABASE_URL"),
-    os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-)
+# Supabase client, created on first use in each worker process rather than
+# at import, so prefork children don't inherit the parent's HTTP connections
+supabase: Optional[Client] = None
+
+def get_db() -> Client:
+    """Return this process's Supabase client, creating it on first use"""
+    global supabase
+    if supabase is None:
+        supabase = create_client(
+            os.environ.get("SUPABASE_URL"),
+            os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+        )
+    return supabase
 
-# Import our algorithms
-from backend.routes.algorithms import (
+# Import our algorithms under the same module name the API uses, so both
+# processes can load the shared on-disk Numba kernel cache
+from routes.algorithms import (
     dijkstra, 
     astar, 
     nn_plus_2opt, 
     create_graph_from_edges,
-    haversine_distance
+    haversine_distance,
+    haversine_matrix,
+    warm_up_kernels
+)
+from routes.graph_cache import (
+    SUBGRAPH_EDGES_TTL,
+    subgraph_edges_key,
+    encode_edges,
+    decode_edges
 )
 
 # Initialize Celery
@@ -39,10 +66,82 @@ celery_app = Celery('route_worker')
 celery_app.conf.broker_url = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 celery_app.conf.result_backend = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
 
+@worker_process_init.connect
+def load_kernels(**kwargs):
+    # Each pool process loads the compiled kernels before taking its first task
+    warm_up_kernels()
+
+# Tasks run on one event loop per worker process, kept open between tasks
+# so the connection pools bound to it (HTTP client, asyncpg) stay warm. Each
+# process runs one task at a time (prefork or solo pool)
+worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's event loop, creating it on first use"""
+    global worker_loop
+    if worker_loop is None or worker_loop.is_closed():
+        worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(worker_loop)
+    return worker_loop
+
+@worker_process_init.connect
+def open_worker_loop(**kwargs):
+    get_worker_loop()
+
+@worker_process_shutdown.connect
+def close_worker_loop(**kwargs):
+    if worker_loop is None or worker_loop.is_closed():
+        return
+    worker_loop.run_until_complete(close_http_client())
+    worker_loop.run_until_complete(close_db_pool())
+    worker_loop.close()
+
+# Shared HTTP client for OSRM and webhook calls, so they reuse keep-alive
+# connections across tasks
+http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=50, keepalive_expiry=30)
+        )
+    return http_client
+
+async def close_http_client() -> None:
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+# With SUPABASE_DB_URL set (and asyncpg installed), the hot internal queries -
+# job status/result writes and subgraph edges - go straight to Postgres over
+# a connection pool instead of a PostgREST HTTP request each
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+db_pool = None
+
+async def get_db_pool():
+    """Return the asyncpg pool, or None when direct database access isn't available"""
+    global db_pool
+    if db_pool is None and asyncpg is not None and SUPABASE_DB_URL:
+        try:
+            db_pool = await asyncpg.create_pool(dsn=SUPABASE_DB_URL, min_size=2, max_size=10)
+        except Exception as e:
+            print(f"[Worker] Error connecting to database, using PostgREST: {e}")
+    return db_pool
+
+async def close_db_pool() -> None:
+    global db_pool
+    if db_pool is not None:
+        await db_pool.close()
+        db_pool = None
+
 async def get_job_params(job_id: str) -> dict:
     """Get job parameters from database"""
     try:
-        response = supabase.table("jobs").select("params").eq("job_id", job_id).execute()
+        response = get_db().table("jobs").select("params").eq("job_id", job_id).execute()
         if response.data and len(response.data) > 0:
             return response.data[0]["params"]
         else:
@@ -67,51 +166,205 @@ async def get_job_params(job_id: str) -> dict:
             "algorithm": "auto"
         }
 
+# Status changes are also published on Redis so the API can stream them to
+# clients (channel jobs:<job_id>, same as backend/app.py)
+redis_client = redis.Redis.from_url(
+    os.getenv('REDIS_URL') or os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+)
+
+def publish_job_event(job_id: str, status: str, progress: int) -> None:
+    """Notify stream subscribers of a job status change (best effort)"""
+    try:
+        redis_client.publish(f"jobs:{job_id}", json.dumps({"job_id": job_id, "status": status, "progress": progress}))
+    except Exception as e:
+        print(f"[Worker] Error publishing status for job {job_id}: {e}")
+
+def report_progress(job_id: str, progress: int) -> None:
+    """
+    Report progress of a running job to stream subscribers only; the jobs
+    row is written when the job starts and when it finishes or fails
+    """
+    publish_job_event(job_id, "running", progress)
+
+# Nearest-node and subgraph-edge lookups are cached in Redis, shared by every
+# worker process, so popular pickups and repeat routes skip the database.
+# Only the small fields the solvers read are stored; subgraph edges use the
+# key scheme and encoding of routes.graph_cache, which the API shares
+NEAREST_NODE_TTL = 86400
+
+def nearest_node_key(lat: float, lng: float) -> str:
+    """Cache key for a coordinate rounded to 5 decimals (~1 m)"""
+    return f"nn:{round(lat, 5)}:{round(lng, 5)}"
+
+def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON value in Redis for ttl seconds (best effort)"""
+    try:
+        redis_client.setex(key, ttl, json.dumps(value))
+    except Exception as e:
+        print(f"[Worker] Error caching {key}: {e}")
+
+def cache_get(key: str) -> Any:
+    """Return a cached JSON value, or None on a miss or if Redis is unavailable"""
+    try:
+        raw = redis_client.get(key)
+    except Exception as e:
+        print(f"[Worker] Error reading cache {key}: {e}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+def cache_node(lat: float, lng: float, node: dict) -> None:
+    cache_set(
+        nearest_node_key(lat, lng),
+        {"id": node["id"], "lat": node["lat"], "lng": node["lng"]},
+        NEAREST_NODE_TTL
+    )
+
+# A value being computed by one job is claimed under <key>:inflight, and
+# other jobs needing it wait for it to be cached instead of computing it
+# again; the claimant publishes on that same name when it is done
+
+def claim_key(key: str, owner: str, ttl: int) -> Optional[str]:
+    """
+    Claim the right to compute key for owner; returns the owner already
+    holding the claim instead, or None if it was taken (or Redis is
+    unavailable, in which case the value is simply computed)
+    """
+    try:
+        if redis_client.set(f"{key}:inflight", owner, nx=True, ex=ttl):
+            return None
+        holder = redis_client.get(f"{key}:inflight")
+    except Exception as e:
+        print(f"[Worker] Error claiming {key}: {e}")
+        return None
+    return holder.decode() if holder else None
+
+def release_key(key: str) -> None:
+    """Drop the claim on key and wake anyone waiting for it"""
+    try:
+        redis_client.delete(f"{key}:inflight")
+        redis_client.publish(f"{key}:inflight", "released")
+    except Exception as e:
+        print(f"[Worker] Error releasing {key}: {e}")
+
+async def wait_for_key(key: str, timeout: float) -> Any:
+    """
+    Wait for the claimant of key to cache its value; None if the claim is
+    released without a value or nothing arrives within timeout seconds
+    """
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(f"{key}:inflight")
+    except Exception as e:
+        print(f"[Worker] Error subscribing to {key}: {e}")
+        return None
+    try:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            # Checked on every wake-up, as the value may land before we subscribed
+            cached = cache_get(key)
+            if cached is not None:
+                return cached
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0 or not redis_client.exists(f"{key}:inflight"):
+                return None
+            await asyncio.to_thread(pubsub.get_message, timeout=min(remaining, 1.0))
+    except Exception as e:
+        print(f"[Worker] Error waiting for {key}: {e}")
+        return None
+    finally:
+        pubsub.close()
+
+# Finished routes are cached by a hash of the job parameters the solver
+# reads (not the user), so duplicate requests skip map matching, the
+# database and OSRM entirely. A route being computed is claimed by its job_id
+ROUTE_RESULT_TTL = 3600
+ROUTE_INFLIGHT_TTL = 300
+ROUTE_WAIT_TIMEOUT = 60
+
+def route_cache_key(params: dict) -> str:
+    route_params = {k: params.get(k) for k in ("pickup", "stops", "dropoff", "algorithm", "optimize_for")}
+    digest = hashlib.sha1(json.dumps(route_params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"route:{digest}"
+
+# OSRM geometry depends only on the endpoints, so it is cached for a week by
+# coordinates rounded to 5 decimals (~1 m), and concurrent jobs asking for
+# the same pair share one upstream request
+OSRM_ROUTE_TTL = 7 * 86400
+OSRM_INFLIGHT_TTL = 35  # longer than the 30 s request timeout
+
+def osrm_cache_key(start_coords, end_coords) -> str:
+    return (f"osrm:{round(start_coords[0], 5)},{round(start_coords[1], 5)}"
+            f"->{round(end_coords[0], 5)},{round(end_coords[1], 5)}")
+
 async def update_job_status(job_id: str, status: str, progress: int = 0) -> None:
     """Update job status in database"""
     try:
-        update_data = {
-            "status": status,
-            "progress": progress,
-            "updated_at": "now()"
-        }
-        response = supabase.table("jobs").update(update_data).eq("job_id", job_id).execute()
+        pool = await get_db_pool()
+        if pool is not None:
+            await pool.execute(
+                "UPDATE jobs SET status = $1, progress = $2, updated_at = now() WHERE job_id = $3",
+                status, progress, job_id
+            )
+        else:
+            update_data = {
+                "status": status,
+                "progress": progress,
+                "updated_at": "now()"
+            }
+            response = get_db().table("jobs").update(update_data).eq("job_id", job_id).execute()
         print(f"[Worker] Updated job {job_id} status to {status} with progress {progress}%")
     except Exception as e:
         print(f"[Worker] Error updating job {job_id} status: {e}")
+        return
+    publish_job_event(job_id, status, progress)
 
 async def update_job_result(job_id: str, result: dict) -> None:
     """Update job result in database"""
     try:
-        update_data = {
-            "result": result,
-            "status": "completed",
-            "progress": 100,
-            "updated_at": "now()"
-        }
-        response = supabase.table("jobs").update(update_data).eq("job_id", job_id).execute()
+        pool = await get_db_pool()
+        if pool is not None:
+            await pool.execute(
+                "UPDATE jobs SET result = $1::jsonb, status = 'completed', progress = 100, updated_at = now() WHERE job_id = $2",
+                json.dumps(result), job_id
+            )
+        else:
+            update_data = {
+                "result": result,
+                "status": "completed",
+                "progress": 100,
+                "updated_at": "now()"
+            }
+            response = get_db().table("jobs").update(update_data).eq("job_id", job_id).execute()
         print(f"[Worker] Updated job {job_id} result: {result}")
     except Exception as e:
         print(f"[Worker] Error updating job {job_id} result: {e}")
+        return
+    publish_job_event(job_id, "completed", 100)
 
 async def find_nearest_node(lat: float, lng: float) -> dict:
     """Find nearest node to given coordinates"""
+    cached = cache_get(nearest_node_key(lat, lng))
+    if cached is not None:
+        return cached
+    
     try:
         # Find nearest node using Euclidean distance approximation
-        response = supabase.rpc("find_nearest_node", {"lat": lat, "lng": lng}).execute()
+        response = get_db().rpc("find_nearest_node", {"lat": lat, "lng": lng}).execute()
         if response.data:
+            cache_node(lat, lng, response.data[0])
             return response.data[0]
         
         # Fallback to simple query if RPC doesn't exist
-        response = supabase.table("nodes").select("*").order("id").limit(1).execute()
+        response = get_db().table("nodes").select("*").order("id").limit(1).execute()
         if response.data:
-            return response.data[0]
+            return dict(response.data[0], fallback=True)
         
         # Return default node if nothing found
         return {
             "id": 1,
             "lat": lat,
-            "lng": lng
+            "lng": lng,
+            "fallback": True
         }
     except Exception as e:
         print(f"[Worker] Error finding nearest node: {e}")
@@ -119,25 +372,70 @@ async def find_nearest_node(lat: float, lng: float) -> dict:
         return {
             "id": 1,
             "lat": lat,
-            "lng": lng
+            "lng": lng,
+            "fallback": True
         }
 
+def used_fallback(records: list) -> bool:
+    """Whether any node or edge is a stand-in returned because the lookup failed"""
+    return any(record.get("fallback") for record in records)
+
+# Worker processes outlive their tasks, so recently used subgraphs are also
+# kept in process for the same TTL as the Redis entry, skipping the Redis
+# round trip and decode when consecutive jobs cover the same nodes
+RECENT_SUBGRAPHS_SIZE = 256
+recent_subgraphs: "OrderedDict[str, tuple]" = OrderedDict()
+
+def remember_subgraph(cache_key: str, edges: list) -> None:
+    recent_subgraphs[cache_key] = (time.monotonic() + SUBGRAPH_EDGES_TTL, edges)
+    recent_subgraphs.move_to_end(cache_key)
+    if len(recent_subgraphs) > RECENT_SUBGRAPHS_SIZE:
+        recent_subgraphs.popitem(last=False)
+
 async def get_subgraph_edges(node_ids: list) -> list:
     """Get edges for subgraph containing specified nodes"""
+    cache_key = subgraph_edges_key(node_ids)
+    entry = recent_subgraphs.get(cache_key)
+    if entry is not None and entry[0] > time.monotonic():
+        recent_subgraphs.move_to_end(cache_key)
+        return entry[1]
+    
     try:
-        # Convert node_ids to a format suitable for SQL IN clause
-        node_ids_str = ','.join(map(str, node_ids))
-        
-        # Query edges where both from_node and to_node are in our node list
-        response = supabase.table("edges").select("*").execute()
-        
-        # Filter edges to only include those connecting our nodes
-        edges = []
-        if response.data:
-            for edge in response.data:
-                if edge["from_node"] in node_ids and edge["to_node"] in node_ids:
-                    edges.append(edge)
-        
+        cached = redis_client.get(cache_key)
+        if cached is not None:
+            edges = decode_edges(cached)
+            remember_subgraph(cache_key, edges)
+            return edges
+    except Exception as e:
+        print(f"[Worker] Error reading cache {cache_key}: {e}")
+    
+    try:
+        # Query edges where both from_node and to_node are in our node list;
+        # the IN filters run in Postgres so only subgraph rows are transferred.
+        # Locations that snapped to the same node are sent once
+        unique_ids = list(dict.fromkeys(node_ids))
+        pool = await get_db_pool()
+        if pool is not None:
+            rows = await pool.fetch(
+                "SELECT id, from_node, to_node, distance_km::float8 AS distance_km, travel_time_min::float8 AS travel_time_min "
+                "FROM edges WHERE from_node = ANY($1::bigint[]) AND to_node = ANY($1::bigint[])",
+                unique_ids
+            )
+            edges = [dict(row) for row in rows]
+        else:
+            response = (
+                get_db().table("edges")
+                .select("id,from_node,to_node,distance_km,travel_time_min")
+                .in_("from_node", unique_ids)
+                .in_("to_node", unique_ids)
+                .execute()
+            )
+            edges = response.data or []
+        remember_subgraph(cache_key, edges)
+        try:
+            redis_client.setex(cache_key, SUBGRAPH_EDGES_TTL, encode_edges(edges))
+        except Exception as e:
+            print(f"[Worker] Error caching {cache_key}: {e}")
         return edges
     except Exception as e:
         print(f"[Worker] Error fetching subgraph edges: {e}")
@@ -154,34 +452,61 @@ async def get_subgraph_edges(node_ids: list) -> list:
                     12.9716 + (i+1)*0.01,
                     77.5946 + (i+1)*0.01
                 ),
-                "travel_time_min": 5
+                "travel_time_min": 5,
+                "fallback": True
             })
         return edges
 
 async def map_match_coordinates(coords: list) -> list:
     """Map-match coordinates to nearest nodes"""
-    nodes = []
-    for coord in coords:
-        node = await find_nearest_node(coord["lat"], coord["lng"])
-        nodes.append(node)
+    nodes = [None] * len(coords)
+    try:
+        cached = redis_client.mget([nearest_node_key(coord["lat"], coord["lng"]) for coord in coords])
+        nodes = [json.loads(raw) if raw is not None else None for raw in cached]
+    except Exception as e:
+        print(f"[Worker] Error reading nearest node cache: {e}")
+    misses = [i for i, node in enumerate(nodes) if node is None]
+    if not misses:
+        return nodes
+    
+    try:
+        # Resolve every uncached coordinate in a single round trip
+        response = get_db().rpc(
+            "find_nearest_nodes",
+            {"coords": [{"lat": coords[i]["lat"], "lng": coords[i]["lng"]} for i in misses]}
+        ).execute()
+        if response.data and len(response.data) == len(misses):
+            for i, node in zip(misses, response.data):
+                nodes[i] = node
+                cache_node(coords[i]["lat"], coords[i]["lng"], node)
+            return nodes
+    except Exception as e:
+        print(f"[Worker] Batched nearest node lookup failed, falling back to single lookups: {e}")
+    
+    # Fallback to one lookup per coordinate if the batched RPC doesn't exist
+    found = await asyncio.gather(*(find_nearest_node(coords[i]["lat"], coords[i]["lng"]) for i in misses))
+    for i, node in zip(misses, found):
+        nodes[i] = node
     return nodes
 
+# A hung n8n endpoint must not stall the job that is notifying it
+N8N_TIMEOUT = httpx.Timeout(10.0, connect=2.0)
+
 async def post_to_n8n_webhook(job_data: dict) -> None:
     """Post job result to n8n webhook"""
     webhook_url = os.getenv('N8N_WEBHOOK_URL')
     webhook_secret = os.getenv('N8N_WEBHOOK_SECRET')
     
-    if not webhook_url or not webhook_secret:
+    if not webhook_url:
         print("[Worker] n8n webhook not configured")
         return
     
-    headers = {
-        'Content-Type': 'application/json',
-        'x-n8n-secret': webhook_secret
-    }
+    headers = {'Content-Type': 'application/json'}
+    if webhook_secret:
+        headers['x-n8n-secret'] = webhook_secret
     
     try:
-        response = requests.post(webhook_url, json=job_data, headers=headers)
+        response = await get_http_client().post(webhook_url, json=job_data, headers=headers, timeout=N8N_TIMEOUT)
         if response.status_code == 200:
             print(f"[Worker] Successfully posted to n8n webhook for job {job_data.get('job_id')}")
         else:
@@ -190,279 +515,229 @@ async def post_to_n8n_webhook(job_data: dict) -> None:
         print(f"[Worker] Error posting to n8n webhook: {str(e)}")
 
 async def get_osrm_route(start_coords, end_coords):
+    """Get route from OSRM routing service, or from the cache"""
+    cache_key = osrm_cache_key(start_coords, end_coords)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+    
+    holder = claim_key(cache_key, str(os.getpid()), OSRM_INFLIGHT_TTL)
+    if holder is not None:
+        # Another job is already fetching this pair
+        cached = await wait_for_key(cache_key, OSRM_INFLIGHT_TTL)
+        if cached is not None:
+            return cached
+    try:
+        result = await fetch_osrm_route(start_coords, end_coords)
+        if result is not None:
+            cache_set(cache_key, result, OSRM_ROUTE_TTL)
+        return result
+    finally:
+        if holder is None:
+            release_key(cache_key)
+
+async def fetch_osrm_route(start_coords, end_coords):
     """Get route from OSRM routing service"""
     try:
         # OSRM route service URL
         osrm_url = f"http://router.project-osrm.org/route/v1/driving/{start_coords[1]},{start_coords[0]};{end_coords[1]},{end_coords[0]}?overview=full&geometries=geojson"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(osrm_url, timeout=30.0)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("routes") and len(data["routes"]) > 0:
-                    route = data["routes"][0]
-                    # Convert OSRM GeoJSON format to our format
-                    coordinates = []
-                    for coord in route["geometry"]["coordinates"]:
-                        # OSRM returns [lng, lat], we need [lng, lat] for our GeoJSON
-                        coordinates.append([coord[0], coord[1]])
-                    
-                    return {
-                        "coordinates": coordinates,
-                        "distance_km": route["distance"] / 1000,  # Convert meters to km
-                        "duration_min": route["duration"] / 60  # Convert seconds to minutes
-                    }
+        client = get_http_client()
+        response = await client.get(osrm_url, timeout=30.0)
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            if data.get("routes") and len(data["routes"]) > 0:
+                route = data["routes"][0]
+                
+                return {
+                    # OSRM GeoJSON is already [lng, lat] pairs, which is our format
+                    "coordinates": route["geometry"]["coordinates"],
+                    "distance_km": route["distance"] / 1000,  # Convert meters to km
+                    "duration_min": route["duration"] / 60  # Convert seconds to minutes
+                }
     except Exception as e:
         print(f"OSRM routing error: {e}")
         return None
 
+def build_route_result(nodes: list, distance_km: float, algorithm: str,
+                       coordinates: Optional[list] = None, eta_min: Optional[float] = None) -> dict:
+    """
+    Build a job result; coordinates default to the straight polyline
+    through the nodes, and the ETA to a mock estimate from the distance
+    """
+    return {
+        "route_geojson": {
+            "type": "LineString",
+            "coordinates": coordinates if coordinates else [[node["lng"], node["lat"]] for node in nodes]
+        },
+        "distance_km": distance_km,
+        "eta_min": distance_km * 2 if eta_min is None else eta_min,  # Mock ETA calculation
+        "algorithm": algorithm
+    }
+
+async def get_road_coordinates(nodes: list) -> list:
+    """Road network geometry from the first to the last node for better visualization, or [] if OSRM fails"""
+    osrm_result = await get_osrm_route(
+        [nodes[0]["lat"], nodes[0]["lng"]],
+        [nodes[-1]["lat"], nodes[-1]["lng"]]
+    )
+    return osrm_result["coordinates"] if osrm_result else []
+
+def build_distance_matrix(nodes: list) -> np.ndarray:
+    """
+    Distance matrix for TSP, using haversine distance as approximation;
+    entry [i, j] is the distance between nodes[i] and nodes[j]
+    """
+    return haversine_matrix(
+        [node["lat"] for node in nodes],
+        [node["lng"] for node in nodes]
+    )
+
+def solve_tsp(nodes: list) -> dict:
+    """Visit all nodes with Nearest Neighbor + 2-opt"""
+    tour, total_distance = nn_plus_2opt(
+        [node["id"] for node in nodes], 
+        build_distance_matrix(nodes)
+    )
+    return build_route_result(nodes, total_distance, "nn+2opt")
+
+async def solve_point_to_point(job_id: str, nodes: list, algorithm: str) -> Tuple[dict, bool]:
+    """
+    Shortest path between the two nodes over their road subgraph with
+    dijkstra or astar; returns (result, whether mock edges were used)
+    """
+    # Get subgraph edges
+    node_ids = [node["id"] for node in nodes]
+    edges = await get_subgraph_edges(node_ids)
+    print(f"[Worker] Retrieved {len(edges)} edges")
+    
+    # Update progress
+    report_progress(job_id, 60)
+    
+    # Create graph representation
+    graph, _ = create_graph_from_edges(edges)
+    
+    if algorithm == "dijkstra":
+        path, distance = dijkstra(graph, nodes[0]["id"], nodes[-1]["id"])
+    else:
+        # Edge rows carry no coordinates, but the subgraph's nodes are exactly
+        # the matched nodes, so the heuristic reads theirs
+        node_coords = {node["id"]: (node["lat"], node["lng"]) for node in nodes}
+        path, distance = astar(graph, node_coords, nodes[0]["id"], nodes[-1]["id"])
+    
+    return build_route_result(nodes, distance, algorithm, await get_road_coordinates(nodes)), used_fallback(edges)
+
+async def complete_job(job_id: str, result: dict) -> None:
+    """Save a job's result, mark it completed and notify the n8n webhook"""
+    # Update progress
+    report_progress(job_id, 90)
+    
+    # Save result to database; the same write marks the job completed
+    await update_job_result(job_id, result)
+    print(f"[Worker] Completed job {job_id}")
+    
+    # Post to n8n webhook
+    await post_to_n8n_webhook({
+        "job_id": job_id,
+        "status": "completed",
+        "result": result
+    })
+
 async def process_job(job_id: str, params: Dict[str, Any]):
     """Process a route calculation job"""
+    route_key = route_cache_key(params)
+    claimed = False
     try:
         print(f"[Worker] Processing job {job_id}")
         
         # Update job status to running
         await update_job_status(job_id, "running", 10)
         
+        # A route computed recently, or being computed right now by another
+        # job, for the same points is reused instead of recomputed
+        cached = cache_get(route_key)
+        if cached is None:
+            leader = claim_key(route_key, job_id, ROUTE_INFLIGHT_TTL)
+            claimed = leader is None
+            if leader is not None:
+                print(f"[Worker] Job {job_id} waiting for identical job {leader}")
+                cached = await wait_for_key(route_key, ROUTE_WAIT_TIMEOUT)
+        if cached is not None:
+            print(f"[Worker] Reusing cached route for job {job_id}")
+            await complete_job(job_id, cached)
+            return
+        
         # Extract locations
         locations_data = [params["pickup"]] + params["stops"] + [params["dropoff"]]
         print(f"[Worker] Locations: {len(locations_data)} points")
         
         # Map-match coordinates to nearest nodes
-        nodes = []
-        for i, loc in enumerate(locations_data):
-            node = await find_nearest_node(loc["lat"], loc["lng"])
-            nodes.append(node)
+        nodes = await map_match_coordinates(locations_data)
+        for i, node in enumerate(nodes):
             print(f"[Worker] Mapped location {i} to node {node['id']}")
         
         # Update progress
-        await update_job_status(job_id, "running", 30)
+        report_progress(job_id, 30)
+        
+        # A route built on stand-ins for an unreachable database is returned
+        # to this job but not cached for identical ones
+        cacheable = not used_fallback(nodes)
+        
+        # Select algorithm
+        algorithm = params["algorithm"]
+        if algorithm == "auto":
+            # For single pair, use A*
+            algorithm = "astar" if len(nodes) == 2 else "nn+2opt"
         
-        # For jobs with more than 6 stops, use TSP approach
-        if len(nodes) > 6:
-            # Create distance matrix for TSP
-            distance_matrix = {}
-            for i, node_i in enumerate(nodes):
-                for j, node_j in enumerate(nodes):
-                    if i != j:
-                        key = (node_i["id"], node_j["id"])
-                        # Use haversine distance as approximation
-                        dist = haversine_distance(
-                            node_i["lat"], node_i["lng"],
-                            node_j["lat"], node_j["lng"]
-                        )
-                        distance_matrix[key] = dist
-            
-            # Solve TSP
-            tour, total_distance = nn_plus_2opt(
-                [node["id"] for node in nodes], 
-                distance_matrix
+        # Compute route based on algorithm; jobs with more than 6 stops always
+        # use the TSP approach
+        if len(nodes) > 6 or (algorithm == "nn+2opt" and len(nodes) > 2):
+            result = solve_tsp(nodes)
+        elif algorithm in ["dijkstra", "astar"] and len(nodes) == 2:
+            result, mock_edges = await solve_point_to_point(job_id, nodes, algorithm)
+            cacheable = cacheable and not mock_edges
+        elif algorithm == "nn+2opt" and len(nodes) == 2:
+            # For direct route with nn+2opt, just calculate haversine distance
+            distance = haversine_distance(
+                nodes[0]["lat"], nodes[0]["lng"],
+                nodes[-1]["lat"], nodes[-1]["lng"]
             )
-            
-            # Try to get road network routing for better visualization
-            road_network_coordinates = []
-            if len(nodes) == 2:
-                # For simple point-to-point, get road network route
-                osrm_result = await get_osrm_route(
-                    [nodes[0]["lat"], nodes[0]["lng"]],
-                    [nodes[1]["lat"], nodes[1]["lng"]]
-                )
-                if osrm_result:
-                    road_network_coordinates = osrm_result["coordinates"]
-            
-            result = {
-                "route_geojson": {
-                    "type": "LineString",
-                    "coordinates": road_network_coordinates if road_network_coordinates else [[node["lng"], node["lat"]] for node in nodes]
-                },
-                "distance_km": total_distance,
-                "eta_min": total_distance * 2,  # Mock ETA calculation
-                "algorithm": "nn+2opt"
-            }
+            result = build_route_result(nodes, distance, "nn+2opt", await get_road_coordinates(nodes))
         else:
-            # For smaller jobs, use direct algorithms
-            # Get subgraph edges
-            node_ids = [node["id"] for node in nodes]
-            edges = await get_subgraph_edges(node_ids)
-            print(f"[Worker] Retrieved {len(edges)} edges")
-            
-            # Update progress
-            await update_job_status(job_id, "running", 60)
-            
-            # Create graph representation
-            graph, node_coords = create_graph_from_edges(edges)
-            
-            # Select algorithm
-            algorithm = params["algorithm"]
-            if algorithm == "auto":
-                # For single pair, use A*
-                algorithm = "astar" if len(nodes) == 2 else "nn+2opt"
-            
-            # Update progress
-            await update_job_status(job_id, "running", 70)
-            
-            # Compute route based on algorithm
-            if algorithm == "dijkstra" and len(nodes) == 2:
-                path, distance = dijkstra(graph, nodes[0]["id"], nodes[-1]["id"])
-                
-                # Try to get road network routing for better visualization
-                road_network_coordinates = []
-                osrm_result = await get_osrm_route(
-                    [nodes[0]["lat"], nodes[0]["lng"]],
-                    [nodes[-1]["lat"], nodes[-1]["lng"]]
-                )
-                if osrm_result:
-                    road_network_coordinates = osrm_result["coordinates"]
-                
-                result = {
-                    "route_geojson": {
-                        "type": "LineString",
-                        "coordinates": road_network_coordinates if road_network_coordinates else [[node["lng"], node["lat"]] for node in nodes]
-                    },
-                    "distance_km": distance,
-                    "eta_min": distance * 2,  # Mock ETA calculation
-                    "algorithm": "dijkstra"
-                }
-            elif algorithm == "astar" and len(nodes) == 2:
-                path, distance = astar(graph, node_coords, nodes[0]["id"], nodes[-1]["id"])
-                
-                # Try to get road network routing for better visualization
-                road_network_coordinates = []
-                osrm_result = await get_osrm_route(
-                    [nodes[0]["lat"], nodes[0]["lng"]],
-                    [nodes[-1]["lat"], nodes[-1]["lng"]]
-                )
-                if osrm_result:
-                    road_network_coordinates = osrm_result["coordinates"]
-                
-                result = {
-                    "route_geojson": {
-                        "type": "LineString",
-                        "coordinates": road_network_coordinates if road_network_coordinates else [[node["lng"], node["lat"]] for node in nodes]
-                    },
-                    "distance_km": distance,
-                    "eta_min": distance * 2,  # Mock ETA calculation
-                    "algorithm": "astar"
-                }
-            elif algorithm in ["nn+2opt", "auto"] and len(nodes) > 2:
-                # Create distance matrix for TSP
-                distance_matrix = {}
-                for i, node_i in enumerate(nodes):
-                    for j, node_j in enumerate(nodes):
-                        if i != j:
-                            key = (node_i["id"], node_j["id"])
-                            # Use haversine distance as approximation
-                            dist = haversine_distance(
-                                node_i["lat"], node_i["lng"],
-                                node_j["lat"], node_j["lng"]
-                            )
-                            distance_matrix[key] = dist
-                
-                # Solve TSP
-                tour, total_distance = nn_plus_2opt(
-                    [node["id"] for node in nodes], 
-                    distance_matrix
-                )
-                
-                result = {
-                    "route_geojson": {
-                        "type": "LineString",
-                        "coordinates": [[node["lng"], node["lat"]] for node in nodes]
-                    },
-                    "distance_km": total_distance,
-                    "eta_min": total_distance * 2,  # Mock ETA calculation
-                    "algorithm": "nn+2opt"
-                }
-            elif algorithm == "nn+2opt" and len(nodes) == 2:
-                # For direct route with nn+2opt, just calculate haversine distance
-                distance = haversine_distance(
-                    nodes[0]["lat"], nodes[0]["lng"],
-                    nodes[-1]["lat"], nodes[-1]["lng"]
-                )
-                
-                # Try to get road network routing for better visualization
-                road_network_coordinates = []
-                osrm_result = await get_osrm_route(
-                    [nodes[0]["lat"], nodes[0]["lng"]],
-                    [nodes[-1]["lat"], nodes[-1]["lng"]]
-                )
-                if osrm_result:
-                    road_network_coordinates = osrm_result["coordinates"]
-                
-                result = {
-                    "route_geojson": {
-                        "type": "LineString",
-                        "coordinates": road_network_coordinates if road_network_coordinates else [[node["lng"], node["lat"]] for node in nodes]
-                    },
-                    "distance_km": distance,
-                    "eta_min": distance * 2,  # Mock ETA calculation
-                    "algorithm": "nn+2opt"
-                }
-            else:
-                # Fallback
-                result = {
-                    "route_geojson": {
-                        "type": "LineString",
-                        "coordinates": [[node["lng"], node["lat"]] for node in nodes]
-                    },
-                    "distance_km": sum(haversine_distance(
-                        nodes[i]["lat"], nodes[i]["lng"],
-                        nodes[i+1]["lat"], nodes[i+1]["lng"]
-                    ) for i in range(len(nodes)-1)),
-                    "eta_min": 30,  # Mock ETA
-                    "algorithm": "simple"
-                }
-            
-            # Update progress
-            await update_job_status(job_id, "running", 90)
-            
-            # Save result to database
-            await update_job_result(job_id, result)
-            print(f"[Worker] Saved result for job {job_id}")
-            
-            # Update job status to completed
-            await update_job_status(job_id, "completed", 100)
-            print(f"[Worker] Completed job {job_id}")
-            
-            # Post to n8n webhook
-            webhook_data = {
-                "job_id": job_id,
-                "status": "completed",
-                "result": result
-            }
-            
-            n8n_webhook_url = os.getenv("N8N_WEBHOOK_URL")
-            if n8n_webhook_url:
-                try:
-                    async with httpx.AsyncClient() as client:
-                        await client.post(n8n_webhook_url, json=webhook_data)
-                except Exception as e:
-                    print(f"[Worker] Failed to post to n8n webhook: {e}")
+            # Fallback
+            distance = sum(haversine_distance(
+                nodes[i]["lat"], nodes[i]["lng"],
+                nodes[i+1]["lat"], nodes[i+1]["lng"]
+            ) for i in range(len(nodes)-1))
+            result = build_route_result(nodes, distance, "simple", eta_min=30)  # Mock ETA
+        
+        # Identical requests arriving later reuse this result
+        if cacheable:
+            cache_set(route_key, result, ROUTE_RESULT_TTL)
+        await complete_job(job_id, result)
     except Exception as e:
         print(f"[Worker] Error processing job {job_id}: {e}")
         # Update job status to failed
         await update_job_status(job_id, "failed", 0)
+    finally:
+        if claimed:
+            release_key(route_key)
 
 @celery_app.task
 def compute_route(job_id: str) -> dict:
     """Celery task to compute route asynchronously"""
     print(f"[Worker] Starting route computation for job {job_id}")
     
-    # Create a new event loop for async operations
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    loop = get_worker_loop()
     
-    try:
-        # Get job parameters
-        params = loop.run_until_complete(get_job_params(job_id))
-        print(f"[Worker] Retrieved job parameters for {job_id}")
-        
-        # Process the job
-        loop.run_until_complete(process_job(job_id, params))
-        
-        return params
-    finally:
-        loop.close()
+    # Get job parameters
+    params = loop.run_until_complete(get_job_params(job_id))
+    print(f"[Worker] Retrieved job parameters for {job_id}")
+    
+    # Process the job
+    loop.run_until_complete(process_job(job_id, params))
+    
+    return params
 
 if __name__ == '__main__':
     celery_app.start()
\ No newline at end of file